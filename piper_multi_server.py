@@ -112,7 +112,11 @@ def create_app(args: argparse.Namespace) -> Flask:
                            voice_ttl_seconds=int(getattr(args, 'voice_ttl_seconds', 7200)),
                            voice_cache_max=int(getattr(args, 'voice_cache_max', 64)))
     _LOGGER.info("Discovered %d voices", len(registry.index))
-    # VC handled inside VCConverter; no global service here
+    # VC handled inside VCConverter; with FREEVC_PREWARM=1 start loading the
+    # model now instead of on the first request.
+    if os.environ.get("FREEVC_PREWARM", "").strip().lower() in ("1", "true", "yes", "on"):
+        from speech_pipeline import vc_service
+        vc_service.prewarm()
 
     def ensure_loaded(model_id: str):
         return registry.ensure_loaded(model_id)
@@ -123,7 +127,7 @@ def create_app(args: argparse.Namespace) -> Flask:
         default_model_path = Path(args.model)
         if not default_model_path.exists():
             raise SystemExit(f"Model not found: {default_model_path}")
-        default_model_id = default_model_path.name.rstrip(".onnx")
+        default_model_id = default_model_path.name.removesuffix(".onnx")
         _ = registry.ensure_loaded(default_model_id)
         registry.index.setdefault(default_model_id, default_model_path)
 
@@ -139,7 +143,7 @@ def create_app(args: argparse.Namespace) -> Flask:
     admin_token = getattr(args, 'admin_token', None) or ''
     if admin_token:
         from speech_pipeline.pipeline_api import api as pipeline_api_bp, init as pipeline_api_init
-        pipeline_api_init(admin_token)
+        pipeline_api_init(admin_token, tts_registry=registry)
         app.register_blueprint(pipeline_api_bp)
         _LOGGER.info("Pipeline control API enabled at /api/ (bearer-authenticated)")
 
@@ -672,7 +676,12 @@ def create_app(args: argparse.Namespace) -> Flask:
                 def gen_sound_only_raw():
                     for b in writer.stream():
                         yield b
-                resp = Response(stream_with_context(gen_sound_only_raw()), mimetype=mtype)
+                # Local files go out via the WSGI file wrapper (sendfile where supported)
+                file_body = writer.sendfile_body(request.environ)
+                if file_body is not None:
+                    resp = Response(file_body, mimetype=mtype, direct_passthrough=True)
+                else:
+                    resp = Response(stream_with_context(gen_sound_only_raw()), mimetype=mtype)
                 # Best-effort: set Content-Length if known to improve playback stability
                 try:
                     if src_ref.startswith('http://') or src_ref.startswith('https://'):
@@ -737,7 +746,9 @@ def create_app(args: argparse.Namespace) -> Flask:
             source = AudioReader(src_ref, bearer=getattr(args, 'bearer', ''))
             # Let stages resolve and fetch target as needed (with bearer), avoiding temp logic here
             pipeline = source.pipe(VCConverter(value_t, bearer=getattr(args, 'bearer', ''))).pipe(PitchAdjuster(value_t, pitch_disable=False, pitch_override_st=None, correction=PITCH_CORRECTION, bearer=getattr(args, 'bearer', '')))
-            writer = ResponseWriter(pipeline, est_frames_24k=source.estimate_frames_24k())
+            # VC/pitch output length is only loosely tied to the source estimate;
+            # stream with open-ended sizes rather than risk clipping audio.
+            writer = ResponseWriter(pipeline, est_frames_24k=source.estimate_frames_24k(), streaming=True)
             def gen_stream_sound():
                 for b in writer.stream():
                     yield b
@@ -774,7 +785,9 @@ def create_app(args: argparse.Namespace) -> Flask:
             source = registry.create_tts_stream(model_id, text, {"sentence_silence": sentence_silence, "chunk_seconds": CHUNKSIZE_SECONDS, "speaker": payload.get("speaker"), "speaker_id": payload.get("speaker_id"), "length_scale": payload.get("length_scale"), "noise_scale": payload.get("noise_scale"), "noise_w_scale": payload.get("noise_w_scale")} )
             # Let stages resolve and fetch target as needed (with bearer)
             pipeline = source.pipe(VCConverter(value_t, bearer=getattr(args, 'bearer', ''))).pipe(PitchAdjuster(value_t, pitch_disable, pitch_override_semitones, correction=PITCH_CORRECTION, bearer=getattr(args, 'bearer', '')))
-            writer = ResponseWriter(pipeline, est_frames_24k=source.estimate_frames_24k())
+            # VC/pitch output length is only loosely tied to the source estimate;
+            # stream with open-ended sizes rather than risk clipping audio.
+            writer = ResponseWriter(pipeline, est_frames_24k=source.estimate_frames_24k(), streaming=True)
             def gen_stream():
                 for b in writer.stream():
                     yield b
@@ -883,7 +896,7 @@ def create_app(args: argparse.Namespace) -> Flask:
         # max_chunk_bytes=4800 → ~0.1s chunks at 24kHz/16bit for low-latency playback
         from lib import StreamingTTSProducer, ResponseWriter
         source = StreamingTTSProducer(text_lines(), voice, syn)
-        writer = ResponseWriter(source, est_frames_24k=0x3FFFFFFF, max_chunk_bytes=4800)
+        writer = ResponseWriter(source, est_frames_24k=None, max_chunk_bytes=4800, streaming=True)
 
         resp = Response(stream_with_context(writer.stream()), mimetype="audio/wav")
         resp.headers["X-Accel-Buffering"] = "no"
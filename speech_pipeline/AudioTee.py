@@ -154,8 +154,7 @@ class AudioTee(Stage):
         except Exception as e:
             _LOGGER.warning("AudioTee side-chain error: %s", e)
 
-    def cancel(self) -> None:
-        super().cancel()
+    def _on_cancel(self) -> None:
         with self._lock:
             sinks = list(self._sidechain_sinks)
         for sink in sinks:
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from typing import Iterator
+
+from .base import Stage
+from .live_pipeline import CellRunner
+
+_LOGGER = logging.getLogger("cell-stage")
+
+
+class CellStage(Stage):
+    """Processor: runs a wrapped stage on its own thread behind CellRunner buffers.
+
+    Built by the DSL's ``buf=N`` option (``gain:2.0:buf=64``).  A feeder
+    thread pulls upstream into the cell's input buffer, the CellRunner
+    thread runs ``stage`` between its two buffers, and stream_pcm24k()
+    yields from the output buffer.  Upstream, the wrapped stage and
+    downstream overlap instead of taking turns on one thread; each hop
+    holds up to ``2 * buffer`` chunks.
+
+    The cell stays in the chain when its stage is replaced: swap() hands
+    the same buffers to the new stage (see CellRunner.swap).
+    """
+
+    def __init__(self, stage: Stage, buffer: int = 32) -> None:
+        super().__init__()
+        self.buffer = buffer
+        self.cell = CellRunner(stage, buffer=buffer)
+        self.input_format = stage.input_format
+        self.output_format = stage.output_format
+
+    @property
+    def stage(self) -> Stage:
+        return self.cell.stage
+
+    def swap(self, new_stage: Stage) -> None:
+        """Replace the wrapped stage while the stream keeps running."""
+        self.cell.swap(new_stage)
+
+    def _feed(self) -> None:
+        put = self.cell.input_q.put
+        try:
+            for chunk in self.upstream.stream_pcm24k():
+                while not self.cancelled:
+                    try:
+                        put(chunk, timeout=0.5)
+                        break
+                    except queue.Full:
+                        pass
+                if self.cancelled:
+                    return
+        except Exception as e:
+            _LOGGER.warning("CellStage feeder error: %s", e)
+        finally:
+            try:
+                put(None, timeout=1.0)
+            except Exception:
+                pass
+
+    def stream_pcm24k(self) -> Iterator[bytes]:
+        if not self.upstream:
+            return
+        threading.Thread(target=self._feed, name=f"cell-feed-{self.id}", daemon=True).start()
+        self.cell.start()
+        get = self.cell.output_q.get
+        eof = False
+        try:
+            while not self.cancelled:
+                try:
+                    chunk = get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if chunk is None:
+                    eof = True
+                    break
+                yield chunk
+        finally:
+            if not eof:
+                # Downstream went away (or we were cancelled): stop both threads
+                self.cancel()
+
+    def _on_cancel(self) -> None:
+        self.cell.stop()
@@ -18,6 +18,12 @@ class FileFetcher:
             return ("http", src)
         return ("file", str(Path(src)))
 
+    @property
+    def file_path(self) -> Optional[Path]:
+        """Local filesystem path if the ref is a plain file, else None."""
+        kind, value = self._classify(self.src_ref)
+        return Path(value) if kind == 'file' else None
+
     @staticmethod
     def build_ref(sound_id: str, template: str, base_dir: Path) -> str:
         """Return a URL or absolute file path from an id and a template.
@@ -63,8 +63,7 @@ class FileRecorder(Stage):
                 self._proc.kill()
             _LOGGER.info("FileRecorder: done -> %s", self.filename)
 
-    def cancel(self) -> None:
-        super().cancel()
+    def _on_cancel(self) -> None:
         if self._proc and self._proc.poll() is None:
             try:
                 self._proc.stdin.close()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import audioop
+import logging
+from typing import Iterator
+
+from .base import AudioFormat, Stage
+
+_LOGGER = logging.getLogger("fused-format-converter")
+
+
+class FusedFormatConverter(Stage):
+    """Changes encoding (u8 <-> s16le) and sample rate in a single stage.
+
+    Equivalent to EncodingConverter -> SampleRateConverter ->
+    EncodingConverter, but each chunk crosses one generator boundary
+    instead of three.  Resampling always runs on s16le so 8-bit input
+    is not re-quantized before interpolation.
+
+    Auto-inserted by Stage.pipe() when both encoding and rate differ
+    (e.g. SIP u8 @ 8kHz <-> TTS s16le @ 22050).
+    """
+
+    _ENCODINGS = ("u8", "s16le")
+
+    def __init__(self, src_encoding: str, src_rate: int, dst_encoding: str, dst_rate: int) -> None:
+        super().__init__()
+        if src_encoding not in self._ENCODINGS or dst_encoding not in self._ENCODINGS:
+            raise ValueError(f"No converter for {src_encoding} -> {dst_encoding}")
+        self.src_encoding = src_encoding
+        self.dst_encoding = dst_encoding
+        self.src_rate = int(src_rate)
+        self.dst_rate = int(dst_rate)
+        self.input_format = AudioFormat(self.src_rate, src_encoding)
+        self.output_format = AudioFormat(self.dst_rate, dst_encoding)
+
+    def stream_pcm24k(self) -> Iterator[bytes]:
+        if not self.upstream:
+            return
+        _LOGGER.info(
+            "FusedFormatConverter: %s@%d -> %s@%d",
+            self.src_encoding, self.src_rate, self.dst_encoding, self.dst_rate,
+        )
+        from_u8 = self.src_encoding == "u8"
+        to_u8 = self.dst_encoding == "u8"
+        resample = self.src_rate != self.dst_rate
+        src_rate, dst_rate = self.src_rate, self.dst_rate
+        state = None
+        for chunk in self.upstream.stream_pcm24k():
+            if self.cancelled:
+                break
+            if from_u8:
+                chunk = audioop.lin2lin(audioop.bias(chunk, 1, -128), 1, 2)
+            if resample:
+                chunk, state = audioop.ratecv(chunk, 2, 1, src_rate, dst_rate, state)
+            if to_u8:
+                chunk = audioop.bias(audioop.lin2lin(chunk, 2, 1), 1, 128)
+            if chunk:
+                yield chunk
@@ -9,6 +9,9 @@ from .base import Stage
 
 _LOGGER = logging.getLogger("pipeline-builder")
 
+# Processor elements that accept a trailing ``buf=N`` option
+_CELL_TYPES = frozenset({"resample", "stt", "vc", "pitch", "gain", "delay"})
+
 
 class PipelineRun:
     """Encapsulates a runnable pipeline with cancel support."""
@@ -65,6 +68,12 @@ class PipelineBuilder:
         gain        GainStage            (gain:FACTOR)
         delay       DelayLine            (delay:MS)
         codec       CodecSocketSource/Sink (codec:ID or codec:ID:PROFILE)
+
+    Processor elements (resample, stt, vc, pitch, gain, delay) take an
+    optional last parameter ``buf=N``: the stage then runs on its own
+    thread in a CellStage with N-chunk buffers on either side, so it
+    overlaps with its neighbours.  Larger N rides out longer stalls at
+    the cost of up to 2*N buffered chunks per side.
     """
 
     def __init__(self, ws, registry, args, live_pipeline=None) -> None:
@@ -105,6 +114,7 @@ class PipelineBuilder:
         for i, (typ, params) in enumerate(elements):
             is_first = (i == 0)
             is_last = (i == len(elements) - 1)
+            params, buffer = self.split_buffer(typ, params)
 
             if typ == "ws":
                 subtype = params[0] if params else "pcm"
@@ -530,6 +540,9 @@ class PipelineBuilder:
             else:
                 raise ValueError(f"Unknown pipeline element: {typ}")
 
+            if buffer is not None:
+                current_stage = self._wrap_cell(run, current_stage, buffer)
+
         # If no explicit run_fn was set (e.g. pipeline ends with a processor),
         # default to draining the last stage
         if run._run_fn is None and current_stage is not None:
@@ -547,6 +560,34 @@ class PipelineBuilder:
 
         return run
 
+    @staticmethod
+    def split_buffer(typ: str, params: List[str]) -> Tuple[List[str], Optional[int]]:
+        """Strip a trailing ``buf=N`` from ``params``: (params, N or None)."""
+        if not params or not params[-1].startswith("buf="):
+            return params, None
+        if typ not in _CELL_TYPES:
+            raise ValueError(f"{typ} does not take buf=")
+        try:
+            buffer = int(params[-1][4:])
+        except ValueError:
+            raise ValueError(f"{typ}: buf= needs a chunk count, got {params[-1]!r}") from None
+        if buffer < 1:
+            raise ValueError(f"{typ}: buf= must be at least 1")
+        return params[:-1], buffer
+
+    @staticmethod
+    def _wrap_cell(run: PipelineRun, stage: Stage, buffer: int) -> Stage:
+        """Put ``stage`` (already piped from its upstream) into a CellStage."""
+        from .CellStage import CellStage
+
+        cell = CellStage(stage, buffer)
+        up = stage.upstream
+        stage.upstream = None
+        if up is not None:
+            cell.set_upstream(up)
+        run.stages[run.stages.index(stage)] = cell
+        return cell
+
     def _populate_live_pipeline(self, run: PipelineRun, elements: List[Tuple[str, List[str]]]) -> None:
         """Register all stages and edges from a built PipelineRun in the LivePipeline."""
         lp = self.live_pipeline
@@ -557,7 +598,7 @@ class PipelineBuilder:
             lp.add_stage(stage, typ)
         # Build edges from upstream/downstream links
         for stage in run.stages:
-            if stage.upstream and stage.upstream.id in lp.stages:
+            if stage.upstream and stage.upstream.id in lp.records:
                 lp.add_edge(stage.upstream.id, stage.id)
 
     def build_multi(self, pipes: List[str]) -> List[PipelineRun]:
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Iterator
+from typing import Iterable, Iterator, Optional
 
 
 class RawResponseWriter:
@@ -15,6 +15,23 @@ class RawResponseWriter:
         except Exception:
             pass
 
+    def sendfile_body(self, environ: dict) -> Optional[Iterable[bytes]]:
+        """Response body for a local-file upstream, or None.
+
+        If the upstream exposes a ``file_path`` (FileFetcher on a local
+        file), wrap the open file with the WSGI file wrapper so servers
+        that support it hand the body to sendfile(2) instead of pumping
+        chunks through stream().  Use with ``direct_passthrough=True``.
+        """
+        path = getattr(self.upstream, 'file_path', None)
+        if path is None:
+            return None
+        try:
+            from werkzeug.wsgi import wrap_file
+            return wrap_file(environ, open(path, 'rb'), self.chunk_bytes)
+        except Exception:
+            return None
+
     def stream(self) -> Iterator[bytes]:
         read = getattr(self.upstream, 'read', None)
         if callable(read):
@@ -2,67 +2,104 @@ from __future__ import annotations
 
 from typing import Iterator, Optional, Any
 import logging
+import struct
 
 from .base import Stage
+from .util import zero_bytes
+
+_UNSET = object()
+
+# Largest single zero chunk yielded while padding to the declared size
+_PAD_CHUNK_BYTES = 64 * 1024
+
+# 44-byte canonical PCM WAV header: RIFF chunk, 16-byte fmt chunk
+# (PCM, mono, rate, byte rate, block align, bits), data chunk header.
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI").pack
 
 
 class ResponseWriter(Stage):
-    def __init__(self, upstream: Stage, est_frames_24k: Optional[int], max_chunk_bytes: Optional[int] = None) -> None:
+    def __init__(
+        self,
+        upstream: Stage,
+        est_frames_24k: Optional[int],
+        max_chunk_bytes: Optional[int] = None,
+        streaming: bool = False,
+    ) -> None:
         super().__init__()
         self.upstream = upstream
         self.est_frames = est_frames_24k
         self.max_chunk_bytes = max_chunk_bytes
+        # Open-ended stream: sizes in the header are 0xFFFFFFFF ("unknown"),
+        # no Content-Length, and the body is neither padded nor clipped.
+        # Also used when there is no estimate to declare.
+        self.streaming = streaming
         # Derive sample rate from upstream if available, else 24000
         if upstream and upstream.output_format and upstream.output_format.sample_rate > 0:
             self.sample_rate = upstream.output_format.sample_rate
         else:
             self.sample_rate = 24000
+        # The chain is fixed once the writer exists, so the estimate (and the
+        # WAV data size derived from it) is computed once and reused by
+        # stream() and apply_headers().
+        self._est_cache: Any = _UNSET
+        self._body_size: Any = _UNSET
 
     def estimate_frames_24k(self) -> Optional[int]:
-        return self.est_frames if self.est_frames is not None else (
-            self.upstream.estimate_frames_24k() if self.upstream else None
-        )
+        if self._est_cache is _UNSET:
+            self._est_cache = self.est_frames if self.est_frames is not None else (
+                self.upstream.estimate_frames_24k() if self.upstream else None
+            )
+        return self._est_cache
+
+    def _declared_body_size(self) -> Optional[int]:
+        """WAV data chunk size announced in the header (and Content-Length).
+
+        Exactly ``est_frames * 2``; None for an open-ended stream, which is
+        also what an unknown estimate gets instead of a guessed size.
+        """
+        if self._body_size is _UNSET:
+            est_frames = None if self.streaming else self.estimate_frames_24k()
+            if est_frames is None or est_frames <= 0:
+                self._body_size = None
+            else:
+                self._body_size = min(int(est_frames) * 2, 0xFFFFFFFE)
+        return self._body_size
 
     def stream(self) -> Iterator[bytes]:
         log = logging.getLogger("piper-multi-server")
+        dbg = log.isEnabledFor(logging.DEBUG)
         sr = self.sample_rate
-        est_frames = self.estimate_frames_24k()
-        if est_frames is None or est_frames <= 0:
-            est_frames = int(30 * sr)
+        declared = self._declared_body_size()
+        if declared is None:
+            data_size = riff_size = 0xFFFFFFFF
         else:
-            est_frames = int(est_frames)
-
-        est_bytes_nominal = max(0, int(est_frames * 2 * 1.05))
-        if est_bytes_nominal % 2:
-            est_bytes_nominal += 1  # keep 16-bit alignment
-        data_size = min(est_bytes_nominal, 0xFFFFFFFF)
-        riff_size = min(36 + data_size, 0xFFFFFFFF)
-        wav_header = (
-            b"RIFF"
-            + riff_size.to_bytes(4, "little", signed=False)
-            + b"WAVEfmt "
-            + (16).to_bytes(4, "little")
-            + (1).to_bytes(2, "little")
-            + (1).to_bytes(2, "little")
-            + sr.to_bytes(4, "little")
-            + (sr * 2).to_bytes(4, "little")
-            + (2).to_bytes(2, "little")
-            + (16).to_bytes(2, "little")
-            + b"data"
-            + data_size.to_bytes(4, "little", signed=False)
+            data_size = declared
+            riff_size = min(36 + data_size, 0xFFFFFFFF)
+        wav_header = _WAV_HEADER(
+            b"RIFF", riff_size, b"WAVE",
+            b"fmt ", 16, 1, 1, sr, sr * 2, 2, 16,
+            b"data", data_size,
         )
         log.debug(
-            "writer: header sent est_frames=%d data_bytes=%d",
-            est_frames,
+            "writer: header sent est_frames=%s data_bytes=%d",
+            self.estimate_frames_24k(),
             data_size,
         )
         yield wav_header
         total = 0
         chunk_idx = 0
+        streamed = 0
         for pcm in self.upstream.stream_pcm24k():
             chunk_idx += 1
             total += len(pcm)
-            log.debug("writer: chunk=%d bytes=%d total=%d", chunk_idx, len(pcm), total)
+            overflow = declared is not None and total > data_size
+            if overflow:
+                # The header (and Content-Length) promise data_size bytes;
+                # never send more than that.
+                pcm = pcm[:max(0, data_size - streamed)]
+            streamed += len(pcm)
+            if dbg:
+                log.debug("writer: chunk=%d bytes=%d total=%d", chunk_idx, len(pcm), total)
             try:
                 if self.max_chunk_bytes and len(pcm) > self.max_chunk_bytes:
                     while len(pcm) > self.max_chunk_bytes:
@@ -70,24 +107,31 @@ class ResponseWriter(Stage):
                         pcm = pcm[self.max_chunk_bytes:]
                     if pcm:
                         yield pcm
-                else:
+                elif pcm:
                     yield pcm
             except (GeneratorExit, BrokenPipeError):
                 log.info("writer: downstream closed at chunk=%d total=%d; cancelling pipeline", chunk_idx, total)
                 self.cancel()
                 break
-        if (not self.cancelled) and total < data_size:
+            if overflow:
+                log.warning(
+                    "writer: upstream exceeds declared size=%d; truncating and cancelling pipeline",
+                    data_size,
+                )
+                self.cancel()
+                break
+        if declared is not None and not self.cancelled and total < data_size:
             pad = data_size - total
             if pad > 0:
                 log.debug("writer: padding bytes=%d to reach declared size=%d", pad, data_size)
-                yield bytes(pad)
+                # Re-yield one cached zero chunk instead of allocating pad bytes
+                zeros = zero_bytes(min(pad, self.max_chunk_bytes or _PAD_CHUNK_BYTES))
+                while pad >= len(zeros):
+                    yield zeros
+                    pad -= len(zeros)
+                if pad:
+                    yield zeros[:pad]
             total = data_size
-        if total > data_size:
-            log.warning(
-                "writer: streamed bytes=%d exceed declared size=%d; header may be too small",
-                total,
-                data_size,
-            )
         log.debug("writer: complete cancelled=%s total_bytes=%d", self.cancelled, total)
 
     def apply_headers(self, resp: Any) -> None:
@@ -110,18 +154,13 @@ class ResponseWriter(Stage):
                 resp.headers["Content-Disposition"] = "inline"
             except Exception:
                 pass
-            # If we can estimate a length, set HTTP Content-Length accordingly
+            # Body is exactly header + declared data size (padded or clipped);
+            # an open-ended body has no known length, so it goes out chunked.
             try:
-                est_frames = self.estimate_frames_24k()
-                if est_frames is None or est_frames <= 0:
-                    est_frames = int(30 * self.sample_rate)
-                else:
-                    est_frames = int(est_frames)
-                est_bytes_nominal = max(0, int(est_frames * 2 * 1.05))
-                if est_bytes_nominal % 2:
-                    est_bytes_nominal += 1
-                total_len = 44 + min(est_bytes_nominal, 0xFFFFFFFF)
-                resp.headers["Content-Length"] = str(total_len)
+                declared = self._declared_body_size()
+                if declared is not None:
+                    resp.headers["Content-Length"] = str(44 + declared)
+                resp.headers["Accept-Ranges"] = "none"
             except Exception:
                 pass
         except Exception:
@@ -4,21 +4,48 @@ import logging
 import socket
 import threading
 import time
-from typing import Optional
+from typing import Any, Callable, Optional
 
 _LOGGER = logging.getLogger("sip-session")
 
 
+def _udp_ports_in_use() -> Optional[set]:
+    """Local UDP ports currently bound, from /proc/net/udp{,6} (Linux only)."""
+    ports: set = set()
+    found = False
+    for table in ("/proc/net/udp", "/proc/net/udp6"):
+        try:
+            with open(table) as f:
+                next(f, None)  # header
+                for line in f:
+                    fields = line.split()
+                    if len(fields) > 1:
+                        ports.add(int(fields[1].rsplit(":", 1)[1], 16))
+            found = True
+        except (OSError, ValueError, IndexError):
+            continue
+    return ports if found else None
+
+
 def _find_free_udp_port(start: int = 5070, end: int = 5199) -> int:
-    """Find a free UDP port in the given range."""
+    """Find a free UDP port in the given range.
+
+    Reads the kernel's UDP socket table once and only bind-tests the
+    first candidate that isn't listed, instead of bind-testing every
+    port in turn.  Falls back to a plain scan without /proc.
+    """
+    in_use = _udp_ports_in_use() or set()
     for port in range(start, end):
+        if port in in_use:
+            continue
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             s.bind(("0.0.0.0", port))
-            s.close()
             return port
         except OSError:
             continue
+        finally:
+            s.close()
     raise RuntimeError(f"No free UDP port found in {start}-{end}")
 
 try:
@@ -30,6 +57,41 @@ except ImportError:
     CallState = None  # type: ignore
 
 
+def _observe_attr(obj, attr: str, on_change: Callable[[Any], None]) -> None:
+    """Call ``on_change(value)`` whenever ``obj.<attr>`` is assigned.
+
+    pyVoIP has no status/state callbacks — it just assigns attributes
+    (VoIPPhone._status, VoIPCall.state).  Swap obj's class for a
+    subclass with a property on that attribute so the assignments
+    notify us.  The value set before the swap stays readable.
+    """
+    slot = f"_observed_{attr}"
+
+    def _get(self):
+        d = self.__dict__
+        return d[slot] if slot in d else d.get(attr)
+
+    def _set(self, value):
+        self.__dict__[slot] = value
+        on_change(value)
+
+    cls = obj.__class__
+    obj.__class__ = type(cls.__name__, (cls,), {attr: property(_get, _set)})
+
+
+_ACK_FMT = (
+    "ACK {uri} SIP/2.0\r\n"
+    "{via}"
+    "Max-Forwards: 70\r\n"
+    "To: {to}\r\n"
+    "From: {fr};tag={tag}\r\n"
+    "Call-ID: {cid}\r\n"
+    "CSeq: {cseq} ACK\r\n"
+    "User-Agent: pyVoIP {ver}\r\n"
+    "Content-Length: 0\r\n\r\n"
+)
+
+
 def _patch_voip_phone(phone: "VoIPPhone") -> None:
     """Fix pyVoIP race condition: ACK never sent for outbound INVITE.
 
@@ -70,9 +132,9 @@ def _patch_voip_phone(phone: "VoIPPhone") -> None:
 
         # Send ACK with corrected To tag
         ack = _build_ack(self.sip, request)
-        self.sip.out.sendto(ack.encode("utf8"), (self.server, self.port))
+        self.sip.out.sendto(ack, (self.server, self.port))
 
-    def _build_ack(sip, request):
+    def _build_ack(sip, request) -> bytes:
         """Build ACK using To tag from the 200 OK (not a new random tag)."""
         import pyVoIP
         tag = sip.tagLibrary[request.headers["Call-ID"]]
@@ -85,18 +147,16 @@ def _patch_voip_phone(phone: "VoIPPhone") -> None:
         else:
             to_header = to_raw
 
-        via = sip._gen_response_via_header(request)
-
-        ack = f"ACK {to_raw.strip('<').strip('>')} SIP/2.0\r\n"
-        ack += via
-        ack += "Max-Forwards: 70\r\n"
-        ack += f"To: {to_header}\r\n"
-        ack += f"From: {request.headers['From']['raw']};tag={tag}\r\n"
-        ack += f"Call-ID: {request.headers['Call-ID']}\r\n"
-        ack += f"CSeq: {request.headers['CSeq']['check']} ACK\r\n"
-        ack += f"User-Agent: pyVoIP {pyVoIP.__version__}\r\n"
-        ack += "Content-Length: 0\r\n\r\n"
-        return ack
+        return _ACK_FMT.format(
+            uri=to_raw.strip("<").strip(">"),
+            via=sip._gen_response_via_header(request),
+            to=to_header,
+            fr=request.headers["From"]["raw"],
+            tag=tag,
+            cid=request.headers["Call-ID"],
+            cseq=request.headers["CSeq"]["check"],
+            ver=pyVoIP.__version__,
+        ).encode("utf8")
 
     phone._callback_RESP_OK = types.MethodType(_patched_callback_RESP_OK, phone)
 
@@ -152,6 +212,8 @@ class SIPSession:
 
         self.connected = threading.Event()
         self.hungup = threading.Event()
+        self._registered = threading.Event()
+        self._call_settled = threading.Event()  # answered or ended
 
         self._phone: Optional[VoIPPhone] = None
         self._call = None
@@ -174,54 +236,52 @@ class SIPSession:
         # Fix pyVoIP ACK race condition before starting
         _patch_voip_phone(self._phone)
 
+        _observe_attr(self._phone, "_status", self._on_phone_status)
         self._phone.start()
 
         # Wait for registration
-        deadline = time.time() + 15
-        while self._phone.get_status() != PhoneStatus.REGISTERED:
-            if time.time() > deadline:
-                raise RuntimeError(
-                    f"SIP registration timeout for {self.username}@{self.server}:{self.port}"
-                )
-            time.sleep(0.3)
+        if self._phone.get_status() == PhoneStatus.REGISTERED:
+            self._registered.set()
+        if not self._registered.wait(timeout=15):
+            raise RuntimeError(
+                f"SIP registration timeout for {self.username}@{self.server}:{self.port}"
+            )
 
         _LOGGER.info("SIP registered as %s@%s:%d", self.username, self.server, self.port)
 
         # Dial
         self._call = self._phone.call(self.target)
+        _observe_attr(self._call, "state", self._on_call_state)
         _LOGGER.info("SIP dialing %s", self.target)
 
         # Wait for answer
-        deadline = time.time() + 30
-        while self._call.state != CallState.ANSWERED:
-            if self._call.state == CallState.ENDED:
-                self.hungup.set()
-                raise RuntimeError(f"SIP call to {self.target} ended/rejected")
-            if time.time() > deadline:
-                try:
-                    self._call.hangup()
-                except Exception:
-                    pass
-                self.hungup.set()
-                raise RuntimeError(f"SIP call to {self.target} answer timeout")
-            time.sleep(0.1)
+        self._on_call_state(self._call.state)
+        if not self._call_settled.wait(timeout=30):
+            try:
+                self._call.hangup()
+            except Exception:
+                pass
+            self.hungup.set()
+            raise RuntimeError(f"SIP call to {self.target} answer timeout")
+        if self._call.state != CallState.ANSWERED:
+            self.hungup.set()
+            raise RuntimeError(f"SIP call to {self.target} ended/rejected")
 
         self.connected.set()
         _LOGGER.info("SIP call answered — connected to %s", self.target)
 
-        # Monitor call state in background
-        t = threading.Thread(target=self._monitor, daemon=True, name="sip-monitor")
-        t.start()
-
-    def _monitor(self) -> None:
-        """Watch for call hangup."""
-        while not self.hungup.is_set():
-            if self._call and self._call.state == CallState.ENDED:
-                self.hungup.set()
-                self.connected.set()  # unblock waiters
-                _LOGGER.info("SIP call ended")
-                return
-            time.sleep(0.5)
+    def _on_phone_status(self, status) -> None:
+        if status == PhoneStatus.REGISTERED:
+            self._registered.set()
+
+    def _on_call_state(self, state) -> None:
+        """Runs on pyVoIP's thread whenever the call state is assigned."""
+        if state in (CallState.ANSWERED, CallState.ENDED):
+            self._call_settled.set()
+        if state == CallState.ENDED and not self.hungup.is_set():
+            self.hungup.set()
+            self.connected.set()  # unblock waiters
+            _LOGGER.info("SIP call ended")
 
     @property
     def call(self):
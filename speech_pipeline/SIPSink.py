@@ -10,6 +10,8 @@ _LOGGER = logging.getLogger("sip-sink")
 
 # 160 bytes u8 @ 8kHz = 20ms per frame
 _FRAME_BYTES = 160
+# Drop consumed bytes from the read buffer once this many have piled up
+_COMPACT_BYTES = 4096
 
 
 class _AudioQueue:
@@ -26,27 +28,46 @@ class _AudioQueue:
 
     def __init__(self):
         self._q: queue.Queue[bytes] = queue.Queue()
-        self._partial = b""
+        # Read cursor into _partial; consumed bytes are only dropped once
+        # the head passes _COMPACT_BYTES, so a frame read doesn't reallocate.
+        self._partial = bytearray()
+        self._head = 0
         self.rebuilding = False  # compat with RTPPacketManager
 
-    def read(self, length: int = 160) -> bytes:
+    def read(self, length: int = _FRAME_BYTES) -> bytes:
         """Called by pyVoIP's trans() thread every ~20ms."""
-        # Collect enough bytes for one frame
-        while len(self._partial) < length:
+        buf = self._partial
+        # Collect enough bytes for one frame: drain what is already queued
+        # without blocking, and only fall back to a short timed wait when
+        # the queue runs dry.
+        q = self._q
+        while len(buf) - self._head < length:
             try:
-                chunk = self._q.get(timeout=0.005)
-                self._partial += chunk
+                buf += q.get_nowait()
             except queue.Empty:
-                break
+                try:
+                    buf += q.get(timeout=0.005)
+                except queue.Empty:
+                    break
 
-        if len(self._partial) >= length:
-            result = self._partial[:length]
-            self._partial = self._partial[length:]
+        head = self._head
+        avail = len(buf) - head
+        if avail >= length:
+            # memoryview slice: one copy into the result, no bytearray temp
+            with memoryview(buf) as mv:
+                result = mv[head:head + length].tobytes()
+            head += length
+            if head >= _COMPACT_BYTES:
+                del buf[:head]
+                head = 0
+            self._head = head
             return result
 
         # Not enough data — return what we have + silence padding
-        result = self._partial + b"\x80" * (length - len(self._partial))
-        self._partial = b""
+        with memoryview(buf) as mv:
+            result = mv[head:].tobytes().ljust(length, b"\x80")
+        buf.clear()
+        self._head = 0
         return result
 
     def write(self, offset: int, data: bytes) -> None:
@@ -61,9 +82,10 @@ class SIPSink(Stage):
     Converters are auto-inserted by pipe() if the upstream stage
     outputs a different format (e.g. s16le @ 22050 from TTS).
 
-    Replaces pyVoIP's broken output buffer with a thread-safe queue,
-    then feeds audio through the normal write_audio() path. pyVoIP's
-    trans() thread handles RTP framing, encoding, and pacing.
+    Replaces pyVoIP's broken output buffer with a thread-safe queue and
+    pushes whole upstream blocks into it. The queue carves 160-byte
+    frames on read; pyVoIP's trans() thread handles RTP encoding and
+    pacing.
 
     Terminal sink — drives the pipeline like WebSocketWriter.run().
     """
@@ -96,23 +118,16 @@ class SIPSink(Stage):
 
         # Replace pyVoIP's broken BytesIO buffer with our queue-based buffer.
         # The trans() thread (already running) will now read from the queue.
-        rtp.pmout = _AudioQueue()
+        out = _AudioQueue()
+        rtp.pmout = out
 
         try:
             for pcm in self.upstream.stream_pcm24k():
                 if self.cancelled or self.session.hungup.is_set():
                     break
-                # Write in 160-byte frames (20ms @ 8kHz u8)
-                for i in range(0, len(pcm), _FRAME_BYTES):
-                    if self.cancelled or self.session.hungup.is_set():
-                        break
-                    chunk = pcm[i:i + _FRAME_BYTES]
-                    if not chunk:
-                        continue
-                    # Pad incomplete final frame with silence
-                    if len(chunk) < _FRAME_BYTES:
-                        chunk = chunk + b"\x80" * (_FRAME_BYTES - len(chunk))
-                    call.write_audio(chunk)
+                # Whole block at once; _AudioQueue.read() does the framing
+                if pcm:
+                    out.write(0, bytes(pcm))
         except Exception as e:
             if not self.cancelled:
                 _LOGGER.warning("SIPSink write error: %s", e)
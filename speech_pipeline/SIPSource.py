@@ -1,12 +1,51 @@
 from __future__ import annotations
 
 import logging
+import queue
+import time
 from typing import Iterator
 
 from .base import AudioFormat, Stage
 
 _LOGGER = logging.getLogger("sip-source")
 
+# 160 bytes u8 @ 8kHz = 20ms per frame
+_FRAME_BYTES = 160
+_FRAME_S = 0.02
+_SILENCE_FRAME = b"\x80" * _FRAME_BYTES
+# How late a frame may be against the 20ms frame clock before the gap is
+# treated as real (DTX, packet loss) and filled with silence.
+_JITTER_S = 0.06
+
+
+class _InboundQueue:
+    """Drop-in replacement for pyVoIP's inbound RTPPacketManager (pmin).
+
+    pyVoIP's recv() thread decodes every RTP packet and hands the PCM to
+    pmin.write().  Queueing those frames lets SIPSource block until a
+    frame actually arrives instead of polling the BytesIO buffer on a
+    fixed 20ms timer.
+    """
+
+    def __init__(self):
+        self._q: queue.Queue[bytes] = queue.Queue()
+        self.rebuilding = False  # compat with RTPPacketManager
+
+    def get(self, timeout: float) -> bytes:
+        """Block until a frame arrives; raises queue.Empty on timeout."""
+        return self._q.get(timeout=timeout)
+
+    def read(self, length: int = 160) -> bytes:
+        """Called by VoIPCall.read_audio() — non-blocking, silence if empty."""
+        try:
+            return self._q.get_nowait()
+        except queue.Empty:
+            return b"\x80" * length
+
+    def write(self, offset: int, data: bytes) -> None:
+        """Called by RTPClient.parse_packet() for each received frame."""
+        self._q.put(data)
+
 
 class SIPSource(Stage):
     """Source stage: reads audio from a pyVoIP SIP call.
@@ -23,8 +62,6 @@ class SIPSource(Stage):
         self.output_format = AudioFormat(8000, "u8")
 
     def stream_pcm24k(self) -> Iterator[bytes]:
-        import time as _time
-
         if not self.session.connected.is_set():
             _LOGGER.info("SIPSource: waiting for call to connect...")
             self.session.connected.wait(timeout=30)
@@ -33,20 +70,33 @@ class SIPSource(Stage):
             _LOGGER.warning("SIPSource: call already hung up")
             return
 
-        _LOGGER.info("SIPSource: streaming audio from SIP call")
         call = self.session.call
+        if not call.RTPClients:
+            _LOGGER.warning("SIPSource: no RTP clients")
+            return
+
+        # Replace pyVoIP's polled BytesIO buffer with a queue so we wake
+        # up exactly when the recv() thread delivers a frame.
+        inbound = _InboundQueue()
+        call.RTPClients[0].pmin = inbound
+
+        _LOGGER.info("SIPSource: streaming audio from SIP call")
+        due = time.monotonic()
         while not self.cancelled and not self.session.hungup.is_set():
+            # Pace against a monotonic frame clock: each emitted frame
+            # (real or silence) covers one 20ms slot.
+            due += _FRAME_S
+            now = time.monotonic()
+            if due < now - _JITTER_S:
+                due = now  # downstream stalled; resync instead of padding
             try:
-                # Non-blocking read: returns whatever is in the RTP buffer.
-                # We pace at real-time (20ms per 160-byte frame) to avoid
-                # spinning when the buffer only has silence.
-                frame = call.read_audio(length=160, blocking=False)
-                if frame:
-                    yield frame
-                _time.sleep(0.02)  # 20ms = one frame period @ 8kHz
-            except Exception as e:
-                if not self.cancelled:
-                    _LOGGER.warning("SIPSource read error: %s", e)
-                break
+                frame = inbound.get(timeout=due + _JITTER_S - now)
+            except queue.Empty:
+                # No RTP well past this slot (DTX, loss): keep the stream
+                # real-time with a silence frame.  Merely late frames
+                # arrive within the jitter allowance and never get here.
+                frame = _SILENCE_FRAME
+            if frame:
+                yield frame
 
         _LOGGER.info("SIPSource: stream ended")
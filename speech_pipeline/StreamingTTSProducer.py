@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+import operator
 from typing import Iterable, Iterator
 
 from .base import AudioFormat, Stage
+from .util import zero_bytes
+
+# Piper yields many small chunks; coalesce to at least this many bytes
+_COALESCE_BYTES = 8192
+
+_audio_of = operator.attrgetter("audio_int16_bytes")
 
 
 class StreamingTTSProducer(Stage):
@@ -31,6 +38,9 @@ class StreamingTTSProducer(Stage):
     def stream_pcm24k(self) -> Iterator[bytes]:
         native_sr = self.voice.config.sample_rate
         silence_bytes = int(native_sr * self.sentence_silence * 2) if self.sentence_silence > 0 else 0
+        silence = zero_bytes(silence_bytes) if silence_bytes > 0 else b""
+        buf = bytearray()
+        extend = buf.extend
         first = True
         for text in self.text_iter:
             if self.cancelled:
@@ -38,10 +48,17 @@ class StreamingTTSProducer(Stage):
             text = text.strip()
             if not text:
                 continue
-            if not first and silence_bytes > 0:
-                yield bytes(silence_bytes)
+            if not first and silence:
+                yield silence
             for chunk in self.voice.synthesize(text, self.syn):
                 if self.cancelled:
                     break
-                yield chunk.audio_int16_bytes
+                extend(_audio_of(chunk))
+                if len(buf) >= _COALESCE_BYTES:
+                    yield bytes(buf)
+                    buf.clear()
+            # Flush at sentence end so playback never waits on the next line
+            if buf and not self.cancelled:
+                yield bytes(buf)
+            buf.clear()
             first = False
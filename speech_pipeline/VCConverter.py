@@ -8,7 +8,7 @@ from typing import Callable, Iterator, Optional, Any
 
 from .base import AudioFormat, Stage
 from .util import ffmpeg_to_pcm16
-from .vc_service import get_freevc_model, conversion_lock
+from .vc_service import conversion_lock, get_freevc_service
 from .FileFetcher import FileFetcher
 
 
@@ -139,11 +139,28 @@ class VCConverter(Stage):
             target_local = None
             target_cleanup = (lambda: None)
         model = self._vc_model if (self.vc_convert is None) else None
+        service = None
+        target_emb = None
         if (self.vc_convert is None) and (model is None):
-            model = get_freevc_model()
+            service = get_freevc_service()
+            if service is not None and target_local is not None:
+                try:
+                    if service.output_sample_rate == 24000:
+                        target_emb = service.target_embedding(str(target_local))
+                except Exception:
+                    target_emb = None
         for idx, pcm in enumerate(self.upstream.stream_pcm24k()):
             if self.cancelled:
                 break
+            if target_emb is not None:
+                # In-memory path: the target is embedded once above, each
+                # chunk goes PCM -> tensor -> PCM without temp WAVs or ffmpeg.
+                try:
+                    out = service.convert_pcm16(pcm, 24000, target_emb)
+                except Exception:
+                    out = pcm
+                yield out
+                continue
             # write PCM to WAV @24k, run VC (or passthrough if unavailable)
             tmp_w = _tempfile.NamedTemporaryFile(prefix=f"pipe_vc_src_{idx:04d}_", suffix=".wav", delete=False)
             w_path = Path(tmp_w.name)
@@ -162,16 +179,17 @@ class VCConverter(Stage):
                         raise RuntimeError("VC target unavailable")
                     self.vc_convert(str(w_path), str(target_local), str(v_path))
                 else:
-                    if model is None:
+                    if model is None and service is None:
                         raise RuntimeError("VC not available; passthrough")
                     if target_local is None:
                         raise RuntimeError("VC target unavailable")
-                    # serialize FreeVC calls to avoid thread-safety issues
-                    try:
+                    if service is not None:
+                        # the service schedules (or batches) FreeVC calls itself
+                        service.convert_to_file(str(w_path), str(target_local), str(v_path))
+                    else:
+                        # serialize FreeVC calls to avoid thread-safety issues
                         with conversion_lock:
                             model.voice_conversion_to_file(source_wav=str(w_path), target_wav=str(target_local), file_path=str(v_path))  # type: ignore
-                    except Exception:
-                        raise
             except Exception:
                 v_path = w_path
             # Normalize to PCM16@24k
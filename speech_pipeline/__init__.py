@@ -1,5 +1,6 @@
 from .base import Stage, AudioFormat
 from .EncodingConverter import EncodingConverter
+from .FusedFormatConverter import FusedFormatConverter
 from .AudioReader import AudioReader
 from .TTSProducer import TTSProducer
 from .VCConverter import VCConverter
@@ -26,6 +27,7 @@ from .AudioTee import AudioTee
 from .AudioMixer import AudioMixer
 from .GainStage import GainStage
 from .DelayLine import DelayLine
+from .CellStage import CellStage
 from .CodecSocketSession import CodecSocketSession, get_session as get_codec_session
 from .CodecSocketSource import CodecSocketSource
 from .CodecSocketSink import CodecSocketSink
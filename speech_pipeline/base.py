@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import logging
+import secrets
 from dataclasses import dataclass
 from typing import Iterator, List, Optional
-from uuid import uuid4
 
 _LOGGER = logging.getLogger("stage")
 
@@ -36,28 +36,21 @@ def _build_converter_chain(src: AudioFormat, dst: AudioFormat) -> List[Stage]:
 
     # Lazy imports to avoid circular dependencies
     from .EncodingConverter import EncodingConverter
+    from .FusedFormatConverter import FusedFormatConverter
     from .SampleRateConverter import SampleRateConverter
 
     chain: List[Stage] = []
-    cur_encoding = src.encoding
-    cur_rate = src.sample_rate
 
-    need_encode = cur_encoding != dst.encoding
-    need_resample = cur_rate != dst.sample_rate and cur_rate > 0 and dst.sample_rate > 0
+    need_encode = src.encoding != dst.encoding
+    need_resample = src.sample_rate != dst.sample_rate and src.sample_rate > 0 and dst.sample_rate > 0
 
     if need_encode and need_resample:
-        # SampleRateConverter works on s16le, so ensure s16le before resampling
-        if cur_encoding != "s16le":
-            chain.append(EncodingConverter(cur_encoding, "s16le"))
-            cur_encoding = "s16le"
-        chain.append(SampleRateConverter(cur_rate, dst.sample_rate))
-        cur_rate = dst.sample_rate
-        if dst.encoding != "s16le":
-            chain.append(EncodingConverter("s16le", dst.encoding))
+        # One stage does decode + resample + encode in a single pass
+        chain.append(FusedFormatConverter(src.encoding, src.sample_rate, dst.encoding, dst.sample_rate))
     elif need_encode:
-        chain.append(EncodingConverter(cur_encoding, dst.encoding))
+        chain.append(EncodingConverter(src.encoding, dst.encoding))
     elif need_resample:
-        chain.append(SampleRateConverter(cur_rate, dst.sample_rate))
+        chain.append(SampleRateConverter(src.sample_rate, dst.sample_rate))
 
     _LOGGER.debug(
         "Auto-inserted %d converter(s): %s -> %s",
@@ -71,7 +64,7 @@ class Stage:
     output_format: Optional[AudioFormat] = None
 
     def __init__(self) -> None:
-        self.id: str = uuid4().hex[:8]
+        self.id: str = secrets.token_hex(4)
         self.upstream: Optional[Stage] = None
         self.downstream: Optional[Stage] = None
         self.cancelled: bool = False
@@ -85,8 +78,9 @@ class Stage:
         """Connect this stage to next_stage.
 
         If both stages declare audio formats and they don't match,
-        converter stages (EncodingConverter, SampleRateConverter) are
-        automatically inserted between them.
+        converter stages (EncodingConverter, SampleRateConverter, or
+        FusedFormatConverter when both differ) are automatically
+        inserted between them.
         """
         src_fmt = self.output_format
         dst_fmt = next_stage.input_format
@@ -102,19 +96,36 @@ class Stage:
         return next_stage.set_upstream(self)
 
     def cancel(self) -> None:
-        if self.cancelled:
-            return
-        self.cancelled = True
-        try:
-            if self.upstream:
-                self.upstream.cancel()
-        except Exception:
-            pass
-        try:
-            if self.downstream:
-                self.downstream.cancel()
-        except Exception:
-            pass
+        """Cancel this stage and every stage linked to it.
+
+        Walks the upstream/downstream links iteratively — each stage is
+        visited once, however long the chain — and runs each stage's
+        ``_on_cancel()`` hook.  Neighbours that override ``cancel()``
+        themselves (or aren't Stages) are handed off to their own method.
+        """
+        stack: List[Stage] = [self]
+        while stack:
+            stage = stack.pop()
+            if stage.cancelled:
+                continue
+            stage.cancelled = True
+            try:
+                stage._on_cancel()
+            except Exception:
+                pass
+            for nb in (stage.upstream, stage.downstream):
+                if nb is None or getattr(nb, "cancelled", False):
+                    continue
+                if isinstance(nb, Stage) and type(nb).cancel is Stage.cancel:
+                    stack.append(nb)
+                else:
+                    try:
+                        nb.cancel()
+                    except Exception:
+                        pass
+
+    def _on_cancel(self) -> None:
+        """Per-stage teardown hook run by cancel(); override to release resources."""
 
     def estimate_frames_24k(self) -> Optional[int]:
         return None
@@ -2,14 +2,18 @@
 
 Usage:
     speech-pipeline run  "cli:text | tts:de_DE-thorsten-medium | cli:raw"
-    speech-pipeline serve [--host HOST] [--port PORT] [--voices-path DIR]
+    speech-pipeline serve [--host HOST] [--port PORT] [--voices-path DIR] [--wsgi waitress]
     speech-pipeline sip-bridge [--extension EXT] [--voice VOICE] [--lang LANG]
     speech-pipeline voices [--voices-path DIR]
 """
 from __future__ import annotations
 
-import argparse
 import sys
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import argparse
 
 
 def cmd_run(args: argparse.Namespace) -> None:
@@ -26,22 +30,42 @@ def cmd_run(args: argparse.Namespace) -> None:
         run.cancel()
 
 
-def cmd_serve(args: argparse.Namespace) -> None:
-    """Start the HTTP/WebSocket server (delegates to piper_multi_server)."""
-    # Import the server module from the repo root (not from the package)
+def _load_repo_script(name: str, what: str):
+    """Import ``<repo root>/<name>.py`` once and return the module.
+
+    The server and SIP bridge are top-level scripts, not package
+    modules.  The loaded module is registered in sys.modules, so a
+    second call (or an earlier regular import) reuses it instead of
+    re-executing the file.
+    """
+    mod = sys.modules.get(name)
+    if mod is not None:
+        return mod
     import importlib.util
     from pathlib import Path
 
-    server_path = Path(__file__).resolve().parents[1] / "piper_multi_server.py"
-    if not server_path.exists():
-        sys.stderr.write(f"Server script not found: {server_path}\n")
+    path = Path(__file__).resolve().parents[1] / f"{name}.py"
+    if not path.exists():
+        sys.stderr.write(f"{what} script not found: {path}\n")
         sys.exit(1)
-    spec = importlib.util.spec_from_file_location("piper_multi_server", server_path)
+    spec = importlib.util.spec_from_file_location(name, path)
     mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
+    sys.modules[name] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except BaseException:
+        sys.modules.pop(name, None)
+        raise
+    return mod
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    """Start the HTTP/WebSocket server (delegates to piper_multi_server)."""
+    # Import the server module from the repo root (not from the package)
+    mod = _load_repo_script("piper_multi_server", "Server")
 
     # Build an args namespace matching what create_app expects
-    server_args = argparse.Namespace(
+    server_args = SimpleNamespace(
         host=args.host,
         port=args.port,
         model=None,
@@ -60,59 +84,54 @@ def cmd_serve(args: argparse.Namespace) -> None:
     import logging
     logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
     app = mod.create_app(server_args)
-    app.run(host=args.host, port=args.port, threaded=True)
+    if getattr(args, "wsgi", "werkzeug") == "waitress":
+        try:
+            from waitress import serve
+        except ImportError:
+            sys.stderr.write("--wsgi waitress requires: pip install waitress\n")
+            sys.exit(1)
+        # No WebSocket support under waitress (flask-sock needs Werkzeug).
+        logging.getLogger("speech-pipeline").warning("waitress: /ws/* WebSocket endpoints are unavailable")
+        serve(app, host=args.host, port=args.port, threads=8, channel_timeout=60)
+    else:
+        app.run(host=args.host, port=args.port, threaded=True)
 
 
 def cmd_sip_bridge(args: argparse.Namespace) -> None:
     """Start the SIP conference bridge (delegates to sip_bridge.py)."""
-    import importlib.util
-    from pathlib import Path
-
-    bridge_path = Path(__file__).resolve().parents[1] / "sip_bridge.py"
-    if not bridge_path.exists():
-        sys.stderr.write(f"SIP bridge script not found: {bridge_path}\n")
-        sys.exit(1)
-    spec = importlib.util.spec_from_file_location("sip_bridge", bridge_path)
-    mod = importlib.util.module_from_spec(spec)
+    mod = _load_repo_script("sip_bridge", "SIP bridge")
     # Replace sys.argv so the bridge's own argparse picks up our flags
     saved_argv = sys.argv
     sys.argv = ["sip-bridge"] + args.extra
     try:
-        spec.loader.exec_module(mod)
         mod.main()
     finally:
         sys.argv = saved_argv
 
 
 def cmd_voices(args: argparse.Namespace) -> None:
-    """List available voices."""
-    from .registry import TTSRegistry
+    """List available voices (filesystem scan only, Piper is not loaded)."""
+    from pathlib import Path
+    from .registry import discover_voices
 
-    registry = TTSRegistry(args.voices_path, use_cuda=False)
-    if not registry.index:
+    index = discover_voices([Path(args.voices_path).resolve()])
+    if not index:
         sys.stderr.write(f"No voices found in {args.voices_path}\n")
         sys.exit(1)
-    for model_id in sorted(registry.index.keys()):
-        path = registry.index[model_id]
+    for model_id in sorted(index.keys()):
+        path = index[model_id]
         sys.stdout.write(f"{model_id}  {path}\n")
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(
-        prog="speech-pipeline",
-        description="Composable stage-based speech pipeline",
-    )
-    parser.add_argument("--debug", action="store_true")
-    sub = parser.add_subparsers(dest="command")
-
-    # --- run ---
+def _add_run_parser(sub) -> None:
     p_run = sub.add_parser("run", help="Run a pipeline from DSL string")
     p_run.add_argument("pipeline", help='Pipeline DSL, e.g. "cli:text | tts:voice | cli:raw"')
     p_run.add_argument("--voices-path", default="voices-piper")
     p_run.add_argument("--cuda", action="store_true")
     p_run.add_argument("--whisper-model", default="small")
 
-    # --- serve ---
+
+def _add_serve_parser(sub) -> None:
     p_serve = sub.add_parser("serve", help="Start the HTTP/WS server")
     p_serve.add_argument("--host", default="0.0.0.0")
     p_serve.add_argument("--port", type=int, default=5000)
@@ -122,28 +141,69 @@ def main() -> None:
     p_serve.add_argument("--soundpath", default="../voices/%s.wav")
     p_serve.add_argument("--bearer", default="")
     p_serve.add_argument("--admin-token", default="", help="Bearer token to enable /api/ pipeline control")
+    p_serve.add_argument(
+        "--wsgi", choices=("werkzeug", "waitress"), default="werkzeug",
+        help="HTTP server: werkzeug (default, supports WebSockets) or waitress (pooled threads, HTTP only)",
+    )
 
-    # --- sip-bridge ---
+
+def _add_sip_bridge_parser(sub) -> None:
     p_sip = sub.add_parser("sip-bridge", help="SIP conference bridge with STT/TTS")
     p_sip.add_argument("extra", nargs="*", help="Extra args forwarded to sip_bridge.py")
 
-    # --- voices ---
+
+def _add_voices_parser(sub) -> None:
     p_voices = sub.add_parser("voices", help="List available voices")
     p_voices.add_argument("--voices-path", default="voices-piper")
 
+
+# subcommand -> (parser builder, handler), in --help order
+_SUBCOMMANDS = {
+    "run": (_add_run_parser, cmd_run),
+    "serve": (_add_serve_parser, cmd_serve),
+    "sip-bridge": (_add_sip_bridge_parser, cmd_sip_bridge),
+    "voices": (_add_voices_parser, cmd_voices),
+}
+
+
+def _sniff_subcommand(argv: list) -> Optional[str]:
+    """Return the subcommand named in argv, skipping global flags.
+
+    Only the first positional token counts; anything else (``--help``,
+    a typo, no command) returns None so main() registers every
+    subparser and argparse produces its usual help/error output.
+    """
+    for tok in argv:
+        if tok.startswith("-"):
+            continue
+        return tok if tok in _SUBCOMMANDS else None
+    return None
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="speech-pipeline",
+        description="Composable stage-based speech pipeline",
+    )
+    parser.add_argument("--debug", action="store_true")
+    sub = parser.add_subparsers(dest="command")
+
+    # Only build the parser for the subcommand actually invoked
+    command = _sniff_subcommand(sys.argv[1:])
+    if command:
+        _SUBCOMMANDS[command][0](sub)
+    else:
+        for add_parser, _ in _SUBCOMMANDS.values():
+            add_parser(sub)
+
     args = parser.parse_args()
     if not args.command:
         parser.print_help()
         sys.exit(1)
 
-    if args.command == "run":
-        cmd_run(args)
-    elif args.command == "serve":
-        cmd_serve(args)
-    elif args.command == "sip-bridge":
-        cmd_sip_bridge(args)
-    elif args.command == "voices":
-        cmd_voices(args)
+    _SUBCOMMANDS[args.command][1](args)
 
 
 if __name__ == "__main__":
@@ -2,11 +2,12 @@
 from __future__ import annotations
 
 import queue
+import secrets
 import threading
 import time
 import logging
+from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
-from uuid import uuid4
 
 from .base import Stage
 
@@ -40,31 +41,83 @@ def list_all() -> List[LivePipeline]:
 
 # ---- LivePipeline ----
 
+@dataclass(slots=True)
+class StageRecord:
+    """A stage registered in a LivePipeline, with its DSL type and config."""
+    stage: Stage
+    typ: str
+    config: dict
+
+
 class LivePipeline:
     """Runtime representation of a running pipeline with named stages."""
 
     def __init__(self, dsl: str = "") -> None:
-        self.id: str = uuid4().hex[:12]
+        self.id: str = secrets.token_hex(6)
         self.dsl: str = dsl
-        self.stages: Dict[str, Stage] = {}       # stage.id -> Stage
-        self.stage_types: Dict[str, str] = {}     # stage.id -> type string
-        self.stage_configs: Dict[str, dict] = {}  # stage.id -> config dict
-        self.edges: List[Tuple[str, str]] = []    # (from_id, to_id)
+        self.records: Dict[str, StageRecord] = {}  # stage.id -> StageRecord
+        # Adjacency index: stage.id -> {neighbour id: None} (ordered sets)
+        self._out: Dict[str, Dict[str, None]] = {}
+        self._in: Dict[str, Dict[str, None]] = {}
         self.run = None                           # PipelineRun reference
         self.created_at: float = time.time()
         self.state: str = "created"               # created | running | stopped
+        # Stage/edge detail for to_dict(detail=True), rebuilt only after
+        # a topology or config change bumps _rev.
+        self._rev: int = 0
+        self._detail_rev: int = -1
+        self._detail: Optional[Tuple[list, list]] = None
+
+    def mark_changed(self) -> None:
+        """Invalidate the cached detail view after mutating stages/edges/configs."""
+        self._rev += 1
 
     def add_stage(self, stage: Stage, typ: str, config: Optional[dict] = None) -> str:
-        self.stages[stage.id] = stage
-        self.stage_types[stage.id] = typ
-        self.stage_configs[stage.id] = config or {}
+        self.records[stage.id] = StageRecord(stage, typ, config or {})
+        self._rev += 1
         return stage.id
 
     def add_edge(self, from_id: str, to_id: str) -> None:
-        self.edges.append((from_id, to_id))
+        self._out.setdefault(from_id, {})[to_id] = None
+        self._in.setdefault(to_id, {})[from_id] = None
+        self._rev += 1
+
+    @property
+    def edges(self) -> List[Tuple[str, str]]:
+        """All (from_id, to_id) edges, derived from the adjacency index."""
+        return [(f, t) for f, outs in self._out.items() for t in outs]
+
+    def remove_stage(self, stage_id: str) -> None:
+        """Drop a stage and every edge touching it (O(degree))."""
+        self.records.pop(stage_id, None)
+        for t in self._out.pop(stage_id, ()):
+            self._in[t].pop(stage_id, None)
+        for f in self._in.pop(stage_id, ()):
+            self._out[f].pop(stage_id, None)
+        self._rev += 1
+
+    def replace_stage(self, old_id: str, stage: Stage, typ: str, config: Optional[dict] = None) -> str:
+        """Put ``stage`` in place of ``old_id``, keeping its edges (O(degree))."""
+        self.records.pop(old_id, None)
+        new_id = self.add_stage(stage, typ, config)
+        outs = self._out.pop(old_id, {})
+        ins = self._in.pop(old_id, {})
+        for t in outs:
+            self._in[t].pop(old_id, None)
+            self._in[t][new_id] = None
+        for f in ins:
+            self._out[f].pop(old_id, None)
+            self._out[f][new_id] = None
+        if outs:
+            self._out[new_id] = outs
+        if ins:
+            self._in[new_id] = ins
+        self._rev += 1
+        return new_id
 
     def get_stage(self, stage_id: str) -> Optional[Stage]:
-        return self.stages.get(stage_id)
+        rec = self.records.get(stage_id)
+        return rec.stage if rec else None
 
     def cancel(self) -> None:
         self.state = "stopped"
@@ -77,30 +130,97 @@ class LivePipeline:
             "dsl": self.dsl,
             "state": self.state,
             "created_at": self.created_at,
-            "stages": len(self.stages),
+            "stages": len(self.records),
         }
         if detail:
-            d["stages"] = []
-            for sid, stage in self.stages.items():
-                entry: dict = {
-                    "id": sid,
-                    "type": self.stage_types.get(sid, "unknown"),
-                    "config": self.stage_configs.get(sid, {}),
-                }
-                if stage.output_format:
-                    entry["output_format"] = {
-                        "sample_rate": stage.output_format.sample_rate,
-                        "encoding": stage.output_format.encoding,
-                    }
-                if stage.input_format:
-                    entry["input_format"] = {
-                        "sample_rate": stage.input_format.sample_rate,
-                        "encoding": stage.input_format.encoding,
-                    }
-                d["stages"].append(entry)
-            d["edges"] = [{"from": f, "to": t} for f, t in self.edges]
+            d["stages"], d["edges"] = self._detail_view()
         return d
 
+    def _detail_view(self) -> Tuple[list, list]:
+        if self._detail is not None and self._detail_rev == self._rev:
+            return self._detail
+        rev = self._rev
+        stages = []
+        for sid, rec in self.records.items():
+            stage = rec.stage
+            entry: dict = {
+                "id": sid,
+                "type": rec.typ,
+                "config": rec.config,
+            }
+            if stage.output_format:
+                entry["output_format"] = {
+                    "sample_rate": stage.output_format.sample_rate,
+                    "encoding": stage.output_format.encoding,
+                }
+            if stage.input_format:
+                entry["input_format"] = {
+                    "sample_rate": stage.input_format.sample_rate,
+                    "encoding": stage.input_format.encoding,
+                }
+            stages.append(entry)
+        edges = [{"from": f, "to": t} for f, t in self.edges]
+        self._detail, self._detail_rev = (stages, edges), rev
+        return self._detail
+
+
+# ---- PingPong: batched chunk hand-off between two threads ----
+
+class PingPong:
+    """Single-producer/single-consumer chunk buffer with two halves.
+
+    The producer appends to the fill half and the consumer drains the
+    half it last took, without locking.  Whenever the consumer has no
+    half pending, put() hands the fill half over at once, so a live
+    stream gets each chunk as soon as it is ready.  While the consumer
+    is busy, chunks collect in the fill half and the next get() that
+    runs dry takes the whole batch: one lock round-trip per batch
+    instead of per chunk, and nothing is left behind when the producer
+    goes idle.
+
+    Queue-compatible where CellRunner and QueueSource need it:
+    ``put(chunk, timeout)`` and ``get(timeout)`` (raises queue.Empty),
+    with ``None`` as the EOF sentinel.  Nothing is ever dropped: when
+    both halves are full, put() blocks (back-pressure) and on timeout
+    raises queue.Full without buffering the chunk, like queue.Queue, so
+    the caller can retry it.
+    """
+
+    def __init__(self, depth: int = 100) -> None:
+        self.depth = max(1, int(depth))
+        self._cond = threading.Condition()
+        # Invariant (under _cond): _fill is empty whenever _ready is None.
+        self._fill: list = []                  # appended by the producer
+        self._ready: Optional[list] = None     # handed over, not yet taken
+        self._drain: list = []                 # consumer-owned
+        self._pos = 0
+
+    def put(self, chunk: Optional[bytes], timeout: Optional[float] = None) -> None:
+        with self._cond:
+            if self._ready is not None and len(self._fill) >= self.depth:
+                if not self._cond.wait_for(lambda: self._ready is None, timeout):
+                    raise queue.Full
+            self._fill.append(chunk)
+            if self._ready is not None:
+                return  # consumer busy; it takes this batch when it runs dry
+            self._ready, self._fill = self._fill, []
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        if self._pos >= len(self._drain):
+            with self._cond:
+                if not self._cond.wait_for(lambda: self._ready is not None, timeout):
+                    raise queue.Empty
+                self._drain = self._ready
+                self._pos = 0
+                # Whatever was put meanwhile becomes the next pending half.
+                self._ready = self._fill or None
+                self._fill = []
+                self._cond.notify()  # producer may be blocked on a full half
+        chunk = self._drain[self._pos]
+        self._pos += 1
+        return chunk
+
 
 # ---- CellRunner: queue-boundary wrapper for hot-swappable stages ----
 
@@ -114,18 +234,36 @@ class CellRunner:
     Usage as a Stage-compatible object:
     - upstream writes to cell.input_q
     - downstream reads from cell.output_q via cell.as_source()
+
+    CellStage does both and puts a cell into a pipeline (DSL ``buf=N``).
+
+    The queues are normally PingPong buffers (one lock per batch of
+    chunks rather than per chunk); a plain queue.Queue also works.
+    Omitted queues are created as PingPong(depth=buffer).  ``buffer``
+    trades memory for overlap: each hop holds up to two halves of
+    ``buffer`` chunks, enough for the producer to keep running while
+    the consumer works, so a chain of cells runs at the rate of its
+    slowest stage instead of stalling hop by hop.
     """
 
-    def __init__(self, stage: Stage, input_q: queue.Queue, output_q: queue.Queue) -> None:
+    def __init__(
+        self,
+        stage: Stage,
+        input_q: Optional[PingPong | queue.Queue] = None,
+        output_q: Optional[PingPong | queue.Queue] = None,
+        buffer: int = 32,
+    ) -> None:
         self.stage = stage
-        self.input_q = input_q
-        self.output_q = output_q
+        self.input_q = input_q if input_q is not None else PingPong(depth=buffer)
+        self.output_q = output_q if output_q is not None else PingPong(depth=buffer)
         self._thread: Optional[threading.Thread] = None
         self._stopped = threading.Event()
 
     def start(self) -> None:
-        self._stopped.clear()
-        self._thread = threading.Thread(target=self._run, daemon=True)
+        # A fresh event per run: a thread outliving stop()'s join timeout
+        # must not be revived by the next start().
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stopped,), daemon=True)
         self._thread.start()
 
     def stop(self, timeout: float = 5.0) -> None:
@@ -134,26 +272,48 @@ class CellRunner:
         if self._thread:
             self._thread.join(timeout=timeout)
 
-    def _run(self) -> None:
+    def _run(self, stop_event: threading.Event) -> None:
         from .QueueSource import QueueSource
 
-        src = QueueSource(self.input_q)
-        src.pipe(self.stage)
+        stage = self.stage
+        fmt = stage.input_format
+        src = QueueSource(self.input_q, fmt.sample_rate, fmt.encoding) if fmt else QueueSource(self.input_q, 0)
+        src.pipe(stage)
+        # Chunks are handed on by reference: no bytes()/bytearray copy
+        # per hop.  Bind the per-chunk calls once.
+        stopped = stop_event.is_set
+        put = self.output_q.put
         try:
-            for chunk in self.stage.stream_pcm24k():
-                if self._stopped.is_set():
+            for chunk in stage.stream_pcm24k():
+                if stopped():
                     break
-                try:
-                    self.output_q.put(chunk, timeout=2.0)
-                except queue.Full:
-                    pass
+                # Back-pressure: wait for the consumer rather than drop audio
+                while True:
+                    try:
+                        put(chunk, timeout=0.5)
+                        break
+                    except queue.Full:
+                        if stopped():
+                            return
         except Exception as e:
             _LOGGER.warning("CellRunner error: %s", e)
-        finally:
-            try:
-                self.output_q.put(None, timeout=1.0)
-            except Exception:
-                pass
+        # EOF only when the stream itself ended; after stop() the queues
+        # may be handed to a replacement stage (swap).
+        if stopped():
+            return
+        try:
+            self.output_q.put(None, timeout=1.0)
+        except Exception:
+            pass
+
+    def as_source(self) -> Stage:
+        """Source stage yielding this cell's output (until the EOF sentinel)."""
+        from .QueueSource import QueueSource
+
+        fmt = self.stage.output_format
+        if fmt:
+            return QueueSource(self.output_q, fmt.sample_rate, fmt.encoding)
+        return QueueSource(self.output_q, 0)
 
     def swap(self, new_stage: Stage) -> None:
         """Replace the running stage with a new one. Brief gap at boundary."""
@@ -7,22 +7,88 @@ from __future__ import annotations
 import functools
 import json
 import logging
+import threading
+from pathlib import Path
+from types import SimpleNamespace
 from typing import Optional
 
-from flask import Blueprint, Response, jsonify, request
+from flask import Blueprint, Response, request, stream_with_context
 
 from . import live_pipeline as registry
+from .CellStage import CellStage
+from .DelayLine import DelayLine
+from .FileFetcher import FileFetcher
+from .GainStage import GainStage
+from .PipelineBuilder import PipelineBuilder
+from .PitchAdjuster import PitchAdjuster
+from .registry import TTSRegistry
+from .SampleRateConverter import SampleRateConverter
+from .VCConverter import VCConverter
+from .WhisperSTT import WhisperTranscriber
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json fallback
+    orjson = None  # type: ignore
+
+
+def _dumps(obj) -> bytes:
+    """Compact JSON as UTF-8 bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _json(obj, status: int = 200) -> Response:
+    return Response(_dumps(obj), status=status, mimetype="application/json")
 
 _LOGGER = logging.getLogger("pipeline-api")
 
 api = Blueprint("pipeline_api", __name__, url_prefix="/api")
 
 _admin_token: Optional[str] = None
+# Shared TTS registry, so loaded voices are reused across requests
+_registry = None
 
 
-def init(admin_token: str) -> None:
-    global _admin_token
+def init(admin_token: str, voices_path: Optional[str] = None, use_cuda: bool = False, tts_registry=None) -> None:
+    """Enable the API.  Pass the server's ``tts_registry`` to share it, or
+    ``voices_path`` to create one up front (otherwise the first request does)."""
+    global _admin_token, _registry
     _admin_token = admin_token
+    if tts_registry is not None:
+        _registry = tts_registry
+    elif voices_path:
+        _registry = TTSRegistry(voices_path, use_cuda=use_cuda)
+
+
+def _get_tts_registry(voices_path: Optional[str], use_cuda: Optional[bool]):
+    """The shared registry, unless the request asks for another voices dir/device."""
+    global _registry
+    if _registry is None:
+        _registry = TTSRegistry(voices_path or "voices-piper", use_cuda=bool(use_cuda))
+    reg = _registry
+    if (voices_path is None or Path(voices_path).resolve() == reg.voices_dir) and (
+        use_cuda is None or bool(use_cuda) == reg.use_cuda
+    ):
+        return reg
+    return TTSRegistry(
+        voices_path or reg.voices_dir,
+        use_cuda=reg.use_cuda if use_cuda is None else bool(use_cuda),
+    )
+
+
+def _builder_args(body: dict):
+    """(args namespace, TTS registry) for a PipelineBuilder from a request body."""
+    tts_registry = _get_tts_registry(body.get("voices_path"), body.get("cuda"))
+    args = SimpleNamespace(
+        whisper_model=body.get("whisper_model", "small"),
+        cuda=tts_registry.use_cuda,
+        voices_path=str(tts_registry.voices_dir),
+        soundpath=body.get("soundpath", "../voices/%s.wav"),
+        bearer=body.get("bearer", ""),
+    )
+    return args, tts_registry
 
 
 def _require_auth(f):
@@ -45,7 +111,14 @@ def _require_auth(f):
 @api.route("/pipelines", methods=["GET"])
 @_require_auth
 def list_pipelines():
-    return jsonify([p.to_dict() for p in registry.list_all()])
+    # Serialize one pipeline at a time instead of building the whole list
+    def _gen():
+        sep = b"["
+        for p in registry.list_all():
+            yield sep + _dumps(p.to_dict())
+            sep = b","
+        yield b"]" if sep == b"," else b"[]"
+    return Response(stream_with_context(_gen()), mimetype="application/json")
 
 
 @api.route("/pipelines/<pid>", methods=["GET"])
@@ -54,7 +127,7 @@ def get_pipeline(pid: str):
     p = registry.get(pid)
     if not p:
         return ("Pipeline not found\n", 404)
-    return jsonify(p.to_dict(detail=True))
+    return _json(p.to_dict(detail=True))
 
 
 @api.route("/pipelines", methods=["POST"])
@@ -66,21 +139,8 @@ def create_pipeline():
     if not dsl:
         return ("Missing 'dsl' in request body\n", 400)
 
-    from .PipelineBuilder import PipelineBuilder
-
-    # Use a minimal args namespace for CLI-created pipelines
-    import argparse
-    args = argparse.Namespace(
-        whisper_model=body.get("whisper_model", "small"),
-        cuda=body.get("cuda", False),
-        voices_path=body.get("voices_path", "voices-piper"),
-        soundpath=body.get("soundpath", "../voices/%s.wav"),
-        bearer=body.get("bearer", ""),
-    )
-
-    # Registry is needed for TTS voices
-    from .registry import TTSRegistry
-    tts_registry = TTSRegistry(args.voices_path, use_cuda=args.cuda)
+    # Minimal args namespace for CLI-created pipelines; registry for TTS voices
+    args, tts_registry = _builder_args(body)
 
     pipeline = registry.LivePipeline(dsl=dsl)
     builder = PipelineBuilder(ws=None, registry=tts_registry, args=args, live_pipeline=pipeline)
@@ -94,7 +154,6 @@ def create_pipeline():
     registry.register(pipeline)
 
     # Run in background thread
-    import threading
     def _run():
         try:
             run.run()
@@ -106,7 +165,7 @@ def create_pipeline():
     t = threading.Thread(target=_run, daemon=True, name=f"pipeline-{pipeline.id}")
     t.start()
 
-    return jsonify(pipeline.to_dict(detail=True)), 201
+    return _json(pipeline.to_dict(detail=True), 201)
 
 
 @api.route("/pipelines/<pid>", methods=["DELETE"])
@@ -129,15 +188,15 @@ def list_stages(pid: str):
     if not p:
         return ("Pipeline not found\n", 404)
     stages = []
-    for sid, stage in p.stages.items():
+    for sid, rec in p.records.items():
         entry = {
             "id": sid,
-            "type": p.stage_types.get(sid, "unknown"),
-            "config": p.stage_configs.get(sid, {}),
-            "cancelled": stage.cancelled,
+            "type": rec.typ,
+            "config": rec.config,
+            "cancelled": rec.stage.cancelled,
         }
         stages.append(entry)
-    return jsonify(stages)
+    return _json(stages)
 
 
 @api.route("/pipelines/<pid>/stages/<sid>", methods=["GET"])
@@ -146,13 +205,14 @@ def get_stage(pid: str, sid: str):
     p = registry.get(pid)
     if not p:
         return ("Pipeline not found\n", 404)
-    stage = p.get_stage(sid)
-    if not stage:
+    rec = p.records.get(sid)
+    if not rec:
         return ("Stage not found\n", 404)
+    stage = rec.stage
     entry = {
         "id": sid,
-        "type": p.stage_types.get(sid, "unknown"),
-        "config": p.stage_configs.get(sid, {}),
+        "type": rec.typ,
+        "config": rec.config,
         "cancelled": stage.cancelled,
     }
     if stage.output_format:
@@ -165,7 +225,26 @@ def get_stage(pid: str, sid: str):
             "sample_rate": stage.input_format.sample_rate,
             "encoding": stage.input_format.encoding,
         }
-    return jsonify(entry)
+    return _json(entry)
+
+
+_hot_update: Optional[dict] = None
+
+
+def _hot_update_spec(cls: type) -> dict:
+    """Hot-updatable fields for a stage class: {field: (setter name, cast)}."""
+    global _hot_update
+    if _hot_update is None:
+        _hot_update = {
+            GainStage: {"gain": ("set_gain", float)},
+            DelayLine: {"delay_ms": ("set_delay_ms", float)},
+        }
+    spec = _hot_update.get(cls)
+    if spec is None:
+        # Subclasses inherit their base's fields; remember the answer
+        spec = next((_hot_update[base] for base in cls.__mro__ if base in _hot_update), {})
+        _hot_update[cls] = spec
+    return spec
 
 
 @api.route("/pipelines/<pid>/stages/<sid>", methods=["PATCH"])
@@ -175,30 +254,30 @@ def patch_stage(pid: str, sid: str):
     p = registry.get(pid)
     if not p:
         return ("Pipeline not found\n", 404)
-    stage = p.get_stage(sid)
-    if not stage:
+    rec = p.records.get(sid)
+    if not rec:
         return ("Stage not found\n", 404)
+    stage = rec.stage
+    if isinstance(stage, CellStage):
+        stage = stage.stage
 
     body = request.get_json(force=True, silent=True) or {}
     config = body.get("config", body)
     updated = {}
 
-    # GainStage
-    if hasattr(stage, "set_gain") and "gain" in config:
-        stage.set_gain(float(config["gain"]))
-        updated["gain"] = float(config["gain"])
-
-    # DelayLine
-    if hasattr(stage, "set_delay_ms") and "delay_ms" in config:
-        stage.set_delay_ms(float(config["delay_ms"]))
-        updated["delay_ms"] = float(config["delay_ms"])
+    for key, (setter, cast) in _hot_update_spec(type(stage)).items():
+        if key in config:
+            value = cast(config[key])
+            getattr(stage, setter)(value)
+            updated[key] = value
 
     if not updated:
         return ("No hot-updatable config found for this stage type\n", 422)
 
     # Persist in stage config
-    p.stage_configs.setdefault(sid, {}).update(updated)
-    return jsonify({"updated": updated})
+    rec.config.update(updated)
+    p.mark_changed()
+    return _json({"updated": updated})
 
 
 @api.route("/pipelines/<pid>/stages/<sid>", methods=["DELETE"])
@@ -224,14 +303,9 @@ def delete_stage(pid: str, sid: str):
     upstream.downstream = downstream
     downstream.upstream = upstream
 
-    # Update edges
-    p.edges = [(f, t) for f, t in p.edges if f != sid and t != sid]
-    p.edges.append((upstream.id, downstream.id))
-
-    # Remove from registry
-    del p.stages[sid]
-    p.stage_types.pop(sid, None)
-    p.stage_configs.pop(sid, None)
+    # Drop the stage and its edges, then link its neighbours directly
+    p.remove_stage(sid)
+    p.add_edge(upstream.id, downstream.id)
 
     stage.cancelled = True
     return ("", 204)
@@ -245,8 +319,9 @@ def replace_stage(pid: str, sid: str):
     Body: {"element": "gain:2.0"} or {"element": "stt:de:3.0:large-v3"}
 
     The stage must be a processor (has upstream and downstream).
-    Uses CellRunner for queue-boundary swapping if the stage is already
-    wrapped, otherwise does a direct swap (brief interruption).
+    A stage built with ``buf=N`` is swapped inside its CellStage, behind
+    the cell's buffers; otherwise the stage is rewired directly (brief
+    interruption).
     """
     p = registry.get(pid)
     if not p:
@@ -261,18 +336,7 @@ def replace_stage(pid: str, sid: str):
         return ("Missing 'element' in request body\n", 400)
 
     # Build the replacement stage using PipelineBuilder.parse + factory
-    from .PipelineBuilder import PipelineBuilder
-    import argparse
-
-    args = argparse.Namespace(
-        whisper_model=body.get("whisper_model", "small"),
-        cuda=body.get("cuda", False),
-        voices_path=body.get("voices_path", "voices-piper"),
-        soundpath=body.get("soundpath", "../voices/%s.wav"),
-        bearer=body.get("bearer", ""),
-    )
-    from .registry import TTSRegistry
-    tts_registry = TTSRegistry(args.voices_path, use_cuda=args.cuda)
+    args, tts_registry = _builder_args(body)
     builder = PipelineBuilder(ws=None, registry=tts_registry, args=args)
 
     parsed = builder.parse(element)
@@ -280,10 +344,26 @@ def replace_stage(pid: str, sid: str):
         return ("Element must be a single stage (e.g. 'gain:2.0')\n", 400)
 
     typ, params = parsed[0]
+    try:
+        params, buffer = builder.split_buffer(typ, params)
+    except ValueError as e:
+        return (f"{e}\n", 400)
+    if buffer is not None and not isinstance(stage, CellStage):
+        return ("buf= only applies when the pipeline is built\n", 400)
     new_stage = _build_single_stage(builder, typ, params)
     if new_stage is None:
         return (f"Cannot build stage from '{element}'\n", 400)
 
+    if isinstance(stage, CellStage):
+        # The cell keeps its id, edges and buffers; only its stage changes
+        stage.swap(new_stage)
+        p.replace_stage(sid, stage, typ, {"params": params})
+        return _json({
+            "old_stage": sid,
+            "new_stage": sid,
+            "type": typ,
+        })
+
     # Wire the new stage in place of the old one
     if stage.upstream:
         new_stage.upstream = stage.upstream
@@ -292,25 +372,12 @@ def replace_stage(pid: str, sid: str):
         new_stage.downstream = stage.downstream
         stage.downstream.upstream = new_stage
 
-    # Update pipeline registry
-    del p.stages[sid]
-    p.stages[new_stage.id] = new_stage
-    p.stage_types[new_stage.id] = typ
-    p.stage_configs[new_stage.id] = {"params": params}
-    p.stage_types.pop(sid, None)
-    p.stage_configs.pop(sid, None)
-
-    # Update edges
-    new_edges = []
-    for f, t in p.edges:
-        new_f = new_stage.id if f == sid else f
-        new_t = new_stage.id if t == sid else t
-        new_edges.append((new_f, new_t))
-    p.edges = new_edges
+    # Update pipeline registry (the new stage inherits the old one's edges)
+    p.replace_stage(sid, new_stage, typ, {"params": params})
 
     stage.cancelled = True
 
-    return jsonify({
+    return _json({
         "old_stage": sid,
         "new_stage": new_stage.id,
         "type": typ,
@@ -321,26 +388,21 @@ def _build_single_stage(builder, typ: str, params: list):
     """Build a single stage from parsed DSL element. Returns Stage or None."""
     try:
         if typ == "resample":
-            from .SampleRateConverter import SampleRateConverter
             src = int(params[0]) if len(params) > 0 else 48000
             dst = int(params[1]) if len(params) > 1 else 16000
             return SampleRateConverter(src, dst)
         elif typ == "gain":
-            from .GainStage import GainStage
             factor = float(params[0]) if params else 1.0
             return GainStage(16000, factor)
         elif typ == "delay":
-            from .DelayLine import DelayLine
             ms = float(params[0]) if params else 0.0
             return DelayLine(16000, ms)
         elif typ == "stt":
-            from .WhisperSTT import WhisperTranscriber
             lang = params[0] if params else None
             chunk_seconds = float(params[1]) if len(params) > 1 else 3.0
             model_size = params[2] if len(params) > 2 else "small"
             return WhisperTranscriber(model_size, chunk_seconds=chunk_seconds, language=lang)
         elif typ == "tts":
-            from .StreamingTTSProducer import StreamingTTSProducer
             voice_id = params[0] if params else None
             if not voice_id or not builder.registry:
                 return None
@@ -349,19 +411,15 @@ def _build_single_stage(builder, typ: str, params: list):
             # TTS needs a text source — can't build standalone
             return None
         elif typ == "vc":
-            from .VCConverter import VCConverter
             voice2 = params[0] if params else None
             if not voice2:
                 return None
-            from .FileFetcher import FileFetcher
-            from pathlib import Path
             here = Path(__file__).resolve().parent.parent
             tmpl = getattr(builder.args, "soundpath", "../voices/%s.wav")
             ref = FileFetcher.build_ref(voice2, tmpl, here)
             bearer = getattr(builder.args, "bearer", "")
             return VCConverter(ref, bearer=bearer)
         elif typ == "pitch":
-            from .PitchAdjuster import PitchAdjuster
             st = float(params[0]) if params else 0.0
             return PitchAdjuster("", pitch_disable=(abs(st) < 0.05), pitch_override_st=st, correction=1.0)
     except Exception as e:
@@ -1,14 +1,32 @@
 from __future__ import annotations
 
+import os
+import re
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
 
-try:
+if TYPE_CHECKING:
     from piper import PiperVoice, SynthesisConfig
-except Exception as e:  # pragma: no cover
-    raise RuntimeError("Piper must be importable before using TTSRegistry") from e
+
+_LANG_RE = re.compile(r"([a-zA-Z]{2,3})")
+
+# (PiperVoice, SynthesisConfig), imported on first use so that voice
+# discovery (e.g. ``speech-pipeline voices``) never loads onnxruntime.
+_piper: Optional[Tuple[Any, Any]] = None
+
+
+def _get_piper() -> Tuple[Any, Any]:
+    global _piper
+    if _piper is None:
+        try:
+            from piper import PiperVoice, SynthesisConfig
+        except Exception as e:  # pragma: no cover
+            raise RuntimeError("Piper must be importable before using TTSRegistry") from e
+        _piper = (PiperVoice, SynthesisConfig)
+    return _piper
 
 
 @dataclass
@@ -21,22 +39,64 @@ class VoiceInfo:
     speaker_id_map: Dict[str, int]
 
 
+# scan root -> ({dir: mtime_ns} for every directory walked, {model_id: path})
+_SCAN_CACHE: Dict[Path, Tuple[Dict[str, int], Dict[str, Path]]] = {}
+
+
+def _scan_dir(root: Path) -> Dict[str, Path]:
+    """Recursive *.onnx scan of one directory, cached by directory mtimes.
+
+    A file added or removed anywhere in the tree bumps the mtime of its
+    parent directory, so re-stat'ing the walked directories is enough to
+    tell whether the cached result is still valid.
+    """
+    hit = _SCAN_CACHE.get(root)
+    if hit is not None:
+        try:
+            if all(os.stat(d).st_mtime_ns == m for d, m in hit[0].items()):
+                return hit[1]
+        except OSError:
+            pass
+
+    dir_mtimes: Dict[str, int] = {}
+    voices: Dict[str, Path] = {}
+
+    def _walk(path: str) -> None:
+        subdirs = []
+        try:
+            dir_mtimes[path] = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.endswith(".onnx"):
+                        voices.setdefault(entry.name.removesuffix(".onnx"), Path(entry.path))
+        except OSError:
+            return
+        for sub in subdirs:
+            _walk(sub)
+
+    _walk(str(root))
+    _SCAN_CACHE[root] = (dir_mtimes, voices)
+    return voices
+
+
 def discover_voices(scan_dirs: Iterable[Path]) -> Dict[str, Path]:
     voices: Dict[str, Path] = {}
     for d in scan_dirs:
         if not d.exists():
             continue
-        for onnx in d.rglob("*.onnx"):
-            model_id = onnx.name[:-5] if onnx.name.endswith(".onnx") else onnx.stem
+        for model_id, onnx in _scan_dir(d).items():
             voices.setdefault(model_id, onnx)
     return voices
 
 
 def load_voice_info(model_path: Path) -> VoiceInfo:
+    PiperVoice, _ = _get_piper()
     voice = PiperVoice.load(model_path)
     cfg = voice.config
     return VoiceInfo(
-        model_id=model_path.name.rstrip(".onnx"),
+        model_id=model_path.name.removesuffix(".onnx"),
         path=model_path,
         espeak_voice=cfg.espeak_voice,
         sample_rate=cfg.sample_rate,
@@ -52,36 +112,49 @@ class TTSRegistry:
         self.voice_ttl = int(max(0, voice_ttl_seconds))
         self.cache_max = int(max(1, voice_cache_max))
         self.index: Dict[str, Path] = discover_voices([self.voices_dir])
-        self.loaded: Dict[str, PiperVoice] = {}
+        # Least recently used first; _mark_used() moves a voice to the end
+        self.loaded: "OrderedDict[str, PiperVoice]" = OrderedDict()
         self.infos: Dict[str, VoiceInfo] = {}
         self.last_used: Dict[str, float] = {}
+        self._last_ttl_sweep = 0.0
+        # path -> (mtime, info): a model is only re-parsed when its file changes
+        self._info_cache: Dict[Path, Tuple[float, VoiceInfo]] = {}
+        # language prefix -> model_id (or None) found by scanning the index
+        self._lang_to_mid: Dict[str, Optional[str]] = {}
 
     def refresh_index(self) -> None:
         self.index.update(discover_voices([self.voices_dir]))
+        self._lang_to_mid.clear()
+
+    def _cached_voice_info(self, path: Path) -> VoiceInfo:
+        mtime = path.stat().st_mtime
+        hit = self._info_cache.get(path)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+        info = load_voice_info(path)
+        self._info_cache[path] = (mtime, info)
+        return info
 
     def _mark_used(self, model_id: str) -> None:
         self.last_used[model_id] = time.time()
+        if model_id in self.loaded:
+            self.loaded.move_to_end(model_id)
 
     def _evict(self) -> None:
-        # TTL eviction
+        # TTL eviction: a full pass, so run it at most every 30s
         now = time.time()
-        for mid, last in list(self.last_used.items()):
-            if (now - float(last)) > self.voice_ttl:
-                self.loaded.pop(mid, None)
-                self.infos.pop(mid, None)
-                self.last_used.pop(mid, None)
-        # LRU size cap
-        if len(self.loaded) > self.cache_max:
-            order = sorted(self.last_used.items(), key=lambda kv: kv[1])
-            overflow = len(self.loaded) - self.cache_max
-            for mid, _ in order:
-                if overflow <= 0:
-                    break
-                if mid in self.loaded:
+        if now - self._last_ttl_sweep > 30:
+            self._last_ttl_sweep = now
+            for mid, last in list(self.last_used.items()):
+                if (now - float(last)) > self.voice_ttl:
                     self.loaded.pop(mid, None)
                     self.infos.pop(mid, None)
                     self.last_used.pop(mid, None)
-                    overflow -= 1
+        # LRU size cap
+        while len(self.loaded) > self.cache_max:
+            mid, _ = self.loaded.popitem(last=False)
+            self.infos.pop(mid, None)
+            self.last_used.pop(mid, None)
 
     def ensure_loaded(self, model_id: str) -> PiperVoice:
         self._evict()
@@ -95,11 +168,12 @@ class TTSRegistry:
             path = self.index.get(model_id)
         if not path:
             raise KeyError(f"Voice not found: {model_id}")
+        PiperVoice, _ = _get_piper()
         voice = PiperVoice.load(path, use_cuda=self.use_cuda)
         self.loaded[model_id] = voice
         self._mark_used(model_id)
         try:
-            self.infos[model_id] = load_voice_info(path)
+            self.infos[model_id] = self._cached_voice_info(path)
         except Exception:
             pass
         return voice
@@ -107,21 +181,25 @@ class TTSRegistry:
     def best_for_lang(self, lang: str) -> Optional[str]:
         if not lang:
             return None
-        import re
-        m = re.match(r"([a-zA-Z]{2,3})", lang)
+        m = _LANG_RE.match(lang)
         lang2 = m.group(1).lower() if m else lang.lower()
         for mid, info in self.infos.items():
             if info.espeak_voice.lower().startswith(lang2):
                 return mid
+        if lang2 in self._lang_to_mid:
+            return self._lang_to_mid[lang2]
+        found: Optional[str] = None
         for mid, onnx in self.index.items():
             try:
-                info = load_voice_info(onnx)
+                info = self._cached_voice_info(onnx)
             except Exception:
                 continue
             self.infos[mid] = info
             if info.espeak_voice.lower().startswith(lang2):
-                return mid
-        return None
+                found = mid
+                break
+        self._lang_to_mid[lang2] = found
+        return found
 
     def create_synthesis_config(self, voice: PiperVoice, params: Dict[str, Any]) -> SynthesisConfig:
         def _as_float(v: Any, fallback: float) -> float:
@@ -155,6 +233,7 @@ class TTSRegistry:
         ls_def = getattr(voice.config, 'length_scale', None) or 1.0
         ns_def = getattr(voice.config, 'noise_scale', None) or 0.667
         nws_def = getattr(voice.config, 'noise_w_scale', None) or 0.8
+        _, SynthesisConfig = _get_piper()
         return SynthesisConfig(
             speaker_id=speaker_id,
             length_scale=_as_float(params.get("length_scale"), ls_def),
@@ -2,12 +2,19 @@ from __future__ import annotations
 
 import subprocess as _sp
 import wave as _wave
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 
 import numpy as _np
 
 
+@lru_cache(maxsize=16)
+def zero_bytes(n: int) -> bytes:
+    """Shared zero-filled buffer of n bytes (s16le silence); never mutate."""
+    return bytes(n)
+
+
 def ffprobe_duration_sec(src: str) -> Optional[float]:
     try:
         out = _sp.check_output(
@@ -1,71 +1,916 @@
+"""FreeVC voice conversion service.
+
+Environment:
+    FREEVC_DEVICE / TTS_DEVICE   "cuda", "cuda:N" or "cuda:auto" to run on a
+                                 GPU (default: CPU); "cuda:auto" picks the GPU
+                                 with the most free memory
+    FREEVC_MIN_VRAM_MB           free memory a GPU needs before FreeVC loads
+                                 onto it (default 1500)
+    FREEVC_BATCH=1               coalesce concurrent conversions into one
+                                 batched forward pass (see _BatchRunner)
+    FREEVC_DTYPE                 fp32 (default), fp16 or bf16; the reduced
+                                 precisions run under CUDA autocast and are
+                                 ignored on CPU
+    FREEVC_COMPILE=1             torch.compile the content encoder, flow and
+                                 decoder at load (warmed up before first use)
+    FREEVC_INT8=1                on CPU, dynamically quantize the model's
+                                 Linear layers (WavLM, speaker encoder) to int8
+    FREEVC_SHM_CACHE=1           share target-speaker embeddings between all
+                                 server processes on the host (SharedEmbCache);
+                                 the process that created the segment unlinks
+                                 it at exit, after a crash remove
+                                 /dev/shm/freevc_emb_<dim> by hand
+    FREEVC_PREWARM=1             the server calls prewarm() at startup to load
+                                 and warm up the model in the background
+                                 instead of on first use
+"""
 from __future__ import annotations
 
+import atexit
+import hashlib
+import logging
 import os
-from typing import Optional
+import queue
+import tempfile
 import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import List, Optional, Sequence, Tuple
 
 try:
-    from TTS.api import TTS as _CoquiTTS  # type: ignore
+    from TTS.config import load_config as _load_config  # type: ignore
+    from TTS.vc.models.freevc import FreeVC as _FreeVC  # type: ignore
 except Exception as e:  # pragma: no cover
-    _CoquiTTS = None  # type: ignore
+    _FreeVC = None  # type: ignore
 
+_LOGGER = logging.getLogger("freevc")
 
-_singleton_model = None
+_singleton_service = None
 _singleton_init_lock = threading.Lock()
+# Serializes calls that go through Coqui's own conversion path (mel-speaker
+# models, VCConverter's injected model).  Tensor-path conversions use _Scheduler.
 conversion_lock = threading.Lock()
 
+# Set once CUDA turns out unusable for good (no driver, GPU too old);
+# later service instances go straight to CPU.  Low free memory and CUDA
+# errors while loading only send that one load to CPU.
+_cuda_failed_permanently = False
+
+# Concurrent forwards on CUDA, one stream each.
+CUDA_STREAMS = 4
+
+# Pinned staging buffer size for host-to-GPU audio uploads (30 s at 48 kHz);
+# longer inputs are copied from pageable memory.
+H2D_MAX_SAMPLES = 30 * 48000
+
+# A batch is flushed once it holds BATCH_MAX requests or BATCH_WAIT_MS
+# have passed since its first request arrived.
+BATCH_MAX = 8
+BATCH_WAIT_MS = 20
+
+# Target-speaker embeddings kept per service, keyed on (path, mtime_ns).
+EMB_CACHE_MAX = 64
+
+# (source_wav, target_wav, file_path)
+ConvertItem = Tuple[str, str, str]
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _strip_weight_norm(module) -> int:
+    """Fold weight norm into plain weights on every submodule; returns the count.
+
+    Weight norm only matters for training; at inference it recomputes
+    g * v / ||v|| on every forward.  Handles both the parametrization
+    API Coqui uses now and the legacy weight_g/weight_v hooks.
+    """
+    from torch.nn.utils import parametrize, remove_weight_norm
+
+    n = 0
+    for m in list(module.modules()):
+        if parametrize.is_parametrized(m, "weight"):
+            if any(type(p).__name__ == "_WeightNorm" for p in m.parametrizations.weight):
+                parametrize.remove_parametrizations(m, "weight")
+                n += 1
+        elif hasattr(m, "weight_g"):
+            try:
+                remove_weight_norm(m)
+                n += 1
+            except ValueError:
+                pass
+    return n
+
+
+class SharedEmbCache:
+    """Fixed-size speaker-embedding table in POSIX shared memory.
+
+    Every process that opens the same name maps the same table, so a host
+    running several server workers encodes each target voice once.  A slot
+    is a 16-byte blake2s key followed by ``dim`` float32 values; lookups
+    probe linearly from the key's hash and an all-zero key marks a free
+    slot.  Access is serialized across processes with flock on a lock
+    file.  When the table is full a new entry overwrites its home slot.
+
+    The process that creates the segment unlinks it at exit.  Workers that
+    still map it keep their view; the next one to start creates a fresh,
+    empty table under the same name.
+    """
+
+    def __init__(self, name: str = "freevc_emb", slots: int = 128, dim: int = 256) -> None:
+        import numpy as np
+        from multiprocessing import resource_tracker, shared_memory
+
+        self.name = name
+        self.slots = int(slots)
+        self.dim = int(dim)
+        stride = 16 + 4 * self.dim
+        size = self.slots * stride
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            created = True
+        except FileExistsError:
+            shm = shared_memory.SharedMemory(name=name)
+            created = False
+        # Other workers may still use the table when this one exits; keep the
+        # resource tracker from unlinking it behind their backs (and from
+        # warning about a "leak" in workers that only opened it).
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+        except Exception:
+            pass
+        if shm.size < size:
+            shm.close()
+            raise RuntimeError(f"shared memory {name!r} is {shm.size} bytes, need {size}")
+        self._shm = shm
+        table = np.ndarray((self.slots, stride), dtype=np.uint8, buffer=shm.buf)
+        self._keys = table[:, :16]
+        self._vals = table[:, 16:].view(np.float32)
+        self._lock_fd = os.open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        if created:
+            atexit.register(self.unlink)
+
+    def close(self) -> None:
+        """Drop this process's mapping and lock file handle; the table stays."""
+        if self._shm is None:
+            return
+        self._keys = self._vals = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # an embedding view is still alive; the mapping goes at exit
+        self._shm = None
+        os.close(self._lock_fd)
+
+    def unlink(self) -> None:
+        """Close, then remove the segment from /dev/shm."""
+        from multiprocessing import shared_memory
+
+        self.close()
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return
+        # unlink() goes through the resource tracker, which must know the name
+        shm.unlink()
+        shm.close()
+
+    @staticmethod
+    def _key(path: str, mtime_ns: int) -> bytes:
+        return hashlib.blake2s(f"{path}\0{mtime_ns}".encode("utf8"), digest_size=16).digest()
+
+    @contextmanager
+    def _locked(self, op: int):
+        import fcntl
+
+        fcntl.flock(self._lock_fd, op)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _find(self, key: bytes) -> Tuple[int, bool]:
+        """(slot, hit): the slot holding key, else the first free one on its probe path."""
+        home = int.from_bytes(key[:8], "little") % self.slots
+        keys = self._keys
+        for i in range(self.slots):
+            slot = (home + i) % self.slots
+            k = keys[slot]
+            if not k.any():
+                return slot, False
+            if k.tobytes() == key:
+                return slot, True
+        return home, False
+
+    def get(self, path: str, mtime_ns: int):
+        """Embedding as a float32 array of length dim, or None."""
+        import fcntl
+
+        key = self._key(path, mtime_ns)
+        with self._locked(fcntl.LOCK_SH):
+            slot, hit = self._find(key)
+            return self._vals[slot].copy() if hit else None
+
+    def put(self, path: str, mtime_ns: int, emb) -> None:
+        import fcntl
+        import numpy as np
+
+        emb = np.asarray(emb, dtype=np.float32).reshape(-1)
+        if emb.size != self.dim:
+            return
+        key = self._key(path, mtime_ns)
+        with self._locked(fcntl.LOCK_EX):
+            slot, _hit = self._find(key)
+            self._vals[slot] = emb
+            self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+
+
+# model name -> (checkpoint path, config path), resolved once per process
+_model_files: dict = {}
+
+
+def _resolve_model_files(model_name: str) -> Tuple[str, str]:
+    """Checkpoint and config paths for a released model, downloading it if needed."""
+    paths = _model_files.get(model_name)
+    if paths is None:
+        import TTS
+        from TTS.utils.manage import ModelManager
+
+        models_file = os.path.join(os.path.dirname(TTS.__file__), ".models.json")
+        manager = ModelManager(models_file=models_file, progress_bar=False, verbose=False)
+        model_path, config_path, _item = manager.download_model(model_name)
+        paths = _model_files[model_name] = (model_path, config_path)
+    return paths
+
+
+def _min_vram_bytes() -> int:
+    return int(os.environ.get("FREEVC_MIN_VRAM_MB") or 1500) << 20
+
+
+def _probe_cuda(device: str) -> Optional[Tuple[str, bool]]:
+    """None if ``device`` can host FreeVC, else ``(why not, permanent)``.
+
+    Checks what would otherwise surface as an opaque failure halfway
+    through loading.  No usable driver or a GPU too old for the torch
+    build won't change while the process runs (``permanent``); too
+    little free memory may clear up once other work finishes.
+    """
+    import torch
+
+    if not torch.cuda.is_available():
+        return "torch.cuda.is_available() is False", True
+    if device == "cuda:auto":
+        return None  # _pick_cuda_device checks each GPU
+    idx = torch.device(device).index
+    if idx is None:
+        idx = torch.cuda.current_device()
+    cap = torch.cuda.get_device_capability(idx)
+    if cap < (5, 2):
+        return f"compute capability {cap[0]}.{cap[1]} is below 5.2", True
+    free, _total = torch.cuda.mem_get_info(idx)
+    if free < _min_vram_bytes():
+        return f"only {free >> 20} MiB free", False
+    return None
+
+
+def _pick_cuda_device() -> Optional[str]:
+    """GPU with the most free memory, provided it has FREEVC_MIN_VRAM_MB free.
+
+    GPUs below compute capability 5.2 are skipped.  Makes the pick the
+    current device so allocations that don't name one land there too.
+    None when no GPU qualifies.
+    """
+    import torch
+
+    min_free = _min_vram_bytes()
+    best, best_free = None, -1
+    for i in range(torch.cuda.device_count()):
+        if torch.cuda.get_device_capability(i) < (5, 2):
+            continue
+        free, _total = torch.cuda.mem_get_info(i)
+        if free >= min_free and free > best_free:
+            best, best_free = i, free
+    if best is None:
+        return None
+    torch.cuda.set_device(best)
+    _LOGGER.info("FreeVC: using cuda:%d (%d MiB free)", best, best_free >> 20)
+    return f"cuda:{best}"
+
+
+class _Scheduler:
+    """Bounds how many FreeVC forwards run at once, without a global mutex.
+
+    On CUDA each slot is its own stream, so overlapping conversions keep
+    the GPU fed instead of queueing behind one lock.  On CPU the slots
+    are plain tokens sized so that slots x torch threads ~ cores.
+    """
+
+    def __init__(self, device) -> None:
+        import torch
+
+        self._slots: "queue.Queue" = queue.Queue()
+        if device.type == "cuda":
+            for _ in range(CUDA_STREAMS):
+                self._slots.put(torch.cuda.Stream(device=device))
+        else:
+            for _ in range(max(1, (os.cpu_count() or 1) // torch.get_num_threads())):
+                self._slots.put(None)
+        self.size = self._slots.qsize()
+
+    @contextmanager
+    def slot(self):
+        stream = self._slots.get()
+        try:
+            if stream is None:
+                yield
+                return
+            import torch
+
+            # Inputs were produced on the caller's stream; results must be
+            # complete before another stream (or .cpu()) reads them.
+            stream.wait_stream(torch.cuda.current_stream(stream.device))
+            with torch.cuda.stream(stream):
+                yield
+            stream.synchronize()
+        finally:
+            self._slots.put(stream)
+
+
+class _PinnedStaging:
+    """Reusable pinned host buffers for uploading audio to the GPU.
+
+    Copies from pageable memory are staged by the driver through a hidden
+    pinned bounce buffer and block the issuing stream.  Staging into
+    page-locked buffers allocated once lets the copy run as a DMA on its
+    own stream, overlapping with forwards running on the scheduler's
+    streams.  One buffer per concurrent caller; a buffer goes back to the
+    pool only after its copy has finished.
+    """
+
+    def __init__(self, device, count: int) -> None:
+        import torch
+
+        self._device = device
+        self._stream = torch.cuda.Stream(device=device)
+        self._free: "queue.Queue" = queue.Queue()
+        for _ in range(max(1, count)):
+            self._free.put(torch.empty(H2D_MAX_SAMPLES, dtype=torch.float32, pin_memory=True))
+
+    def upload(self, x):
+        import torch
+
+        n = x.numel()
+        if n > H2D_MAX_SAMPLES:
+            return x.to(self._device)
+        buf = self._free.get()
+        try:
+            staged = buf[:n]
+            staged.copy_(x)
+            # Allocated on the caller's stream, which is where it is used
+            # and eventually freed.
+            dst = torch.empty(n, dtype=torch.float32, device=self._device)
+            self._stream.wait_stream(torch.cuda.current_stream(self._device))
+            with torch.cuda.stream(self._stream):
+                dst.copy_(staged, non_blocking=True)
+            self._stream.synchronize()
+        finally:
+            self._free.put(buf)
+        return dst
+
 
 class FreeVCService:
+    __slots__ = (
+        "model_name", "device_pref_env", "_model", "_vc", "_amp_dtype",
+        "_resamplers", "_emb_cache", "_emb_lock", "_shared_emb",
+        "_scheduler", "_h2d", "_batcher",
+    )
+
     def __init__(self, model_name: str = "voice_conversion_models/multilingual/vctk/freevc24", device_pref_env: Optional[str] = None) -> None:
         self.model_name = model_name
         self.device_pref_env = device_pref_env or os.environ.get("FREEVC_DEVICE") or os.environ.get("TTS_DEVICE") or ""
         self._model = None
+        self._vc = None
+        self._amp_dtype = None
+        self._resamplers: dict = {}
+        self._emb_cache: "OrderedDict[tuple, object]" = OrderedDict()
+        self._emb_lock = threading.Lock()
+        self._shared_emb: Optional[SharedEmbCache] = None
+        self._scheduler: Optional[_Scheduler] = None
+        self._h2d: Optional[_PinnedStaging] = None
+        self._batcher: Optional[_BatchRunner] = None
 
     def _init_to(self, device: str):
-        if _CoquiTTS is None:
+        if _FreeVC is None:
             raise RuntimeError("VC unavailable: TTS not installed")
         if device == "cpu":
             os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
-        t = _CoquiTTS(self.model_name, gpu=False)  # type: ignore
-        try:
-            t.to(device)
-        except Exception:
-            if device != "cpu":
-                os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
-                t.to("cpu")
-        return t
+        checkpoint, config_path = _resolve_model_files(self.model_name)
+        config = _load_config(config_path)
+        vc = _FreeVC.init_from_config(config)
+        vc.load_checkpoint(config, checkpoint, eval=True)
+        vc.to(device)
+        if hasattr(vc, "enc_spk_ex"):
+            # SpeakerEncoder pins its device at construction and ignores .to()
+            vc.enc_spk_ex.device = vc.device
+        return vc
+
+    def _try_cuda(self, device: str):
+        """Load onto ``device``, or return None after logging why not.
+
+        Only a missing driver or a too-old GPU marks CUDA as unusable for
+        the rest of the process.  Too little free memory and CUDA errors
+        while loading send just this load to CPU; an out-of-memory error
+        is first retried once after emptying the allocator cache.  Errors
+        unrelated to CUDA (download, config, checkpoint) propagate.
+        """
+        global _cuda_failed_permanently
+        import torch
+
+        probe = _probe_cuda(device)
+        if probe is None and device == "cuda:auto":
+            picked = _pick_cuda_device()
+            if picked is None:
+                probe = f"no CUDA device with {_min_vram_bytes() >> 20} MiB free", False
+            else:
+                device = picked
+        if probe is not None:
+            reason, permanent = probe
+            _LOGGER.warning("FreeVC: not using %s: %s; running on CPU", device, reason)
+            if permanent:
+                _cuda_failed_permanently = True
+            return None
+        for attempt in (1, 2):
+            try:
+                return self._init_to(device)
+            except torch.cuda.OutOfMemoryError as e:
+                torch.cuda.empty_cache()
+                if attempt == 1:
+                    _LOGGER.warning("FreeVC: out of memory on %s (%s); retrying", device, e)
+                    continue
+                _LOGGER.warning("FreeVC: out of memory on %s again; running on CPU", device)
+            except RuntimeError as e:
+                if "CUDA" not in str(e):
+                    raise
+                _LOGGER.warning("FreeVC: loading on %s failed (%s); running on CPU", device, e)
+                break
+        return None
 
     def get_model(self):
         if self._model is not None:
             return self._model
-        want_cuda = (self.device_pref_env or "").lower() == "cuda"
-        if want_cuda:
+        pref = (self.device_pref_env or "").strip().lower()
+        t = None
+        if pref.startswith("cuda") and not _cuda_failed_permanently:
+            t = self._try_cuda(pref)
+        if t is None:
+            t = self._init_to("cpu")
+        self._vc = t
+        self._vc.eval()
+        _LOGGER.debug("FreeVC: removed weight norm from %d modules", _strip_weight_norm(self._vc))
+        if _env_flag("FREEVC_INT8") and self._vc.device.type == "cpu":
+            self._quantize_int8()
+        self._amp_dtype = self._resolve_amp_dtype()
+        self._scheduler = _Scheduler(self._vc.device)
+        if self._vc.device.type == "cuda":
             try:
-                self._model = self._init_to("cuda")
-                return self._model
-            except Exception:
-                pass
-        self._model = self._init_to("cpu")
-        return self._model
+                self._h2d = _PinnedStaging(self._vc.device, self._scheduler.size)
+            except Exception as e:
+                _LOGGER.warning("FreeVC: pinned staging unavailable (%s: %s)", type(e).__name__, e)
+        if _env_flag("FREEVC_SHM_CACHE") and self._vc.config.model_args.use_spk:
+            try:
+                dim = self._vc.gin_channels
+                self._shared_emb = SharedEmbCache(name=f"freevc_emb_{dim}", dim=dim)
+            except Exception as e:
+                _LOGGER.warning("FreeVC: shared embedding cache unavailable (%s: %s)", type(e).__name__, e)
+        self._model = t
+        if _env_flag("FREEVC_COMPILE"):
+            self._compile()
+        return t
+
+    def _quantize_int8(self) -> None:
+        """Swap every nn.Linear for a dynamically quantized int8 version, in place.
+
+        Dynamic quantization only covers Linear (and RNN) layers, which is
+        where WavLM spends its time; the Conv1d-based encoder, flow and
+        decoder stay fp32.
+        """
+        import torch
+
+        try:
+            torch.ao.quantization.quantize_dynamic(self._vc, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+            _LOGGER.info("FreeVC: Linear layers quantized to int8")
+        except Exception as e:
+            _LOGGER.warning("FreeVC: int8 quantization failed (%s: %s); running fp32", type(e).__name__, e)
+
+    # Submodules inference() runs on every conversion; WavLM and the
+    # speaker encoder stay eager.
+    _COMPILED = ("enc_p", "flow", "dec")
+
+    def _compile(self) -> None:
+        """torch.compile the hot submodules and pay the compile cost now.
+
+        Compilation is lazy, so a warm-up conversion forces it; if that
+        fails the eager modules are put back.  Default mode, not
+        "reduce-overhead": CUDA graphs would record a graph per input
+        length and hand out static output buffers that the next replay
+        overwrites, which is unsafe with variable-length audio and
+        concurrent streams.
+        """
+        import torch
+
+        vc = self._vc
+        eager = {name: getattr(vc, name) for name in self._COMPILED}
+        try:
+            for name, mod in eager.items():
+                setattr(vc, name, torch.compile(mod, dynamic=True))
+            self.warmup()
+            _LOGGER.info("FreeVC: compiled %s", ", ".join(self._COMPILED))
+        except Exception as e:
+            for name, mod in eager.items():
+                setattr(vc, name, mod)
+            _LOGGER.warning("FreeVC: torch.compile failed (%s: %s); running eager", type(e).__name__, e)
+
+    def warmup(self, seconds: float = 1.0) -> None:
+        """Run one conversion of silence so lazy init happens before real traffic."""
+        import torch
+
+        self.get_model()
+        vc = self._vc
+        src = torch.zeros(int(vc.config.audio.input_sample_rate * seconds), device=vc.device)
+        g = torch.zeros(1, vc.gin_channels, 1, device=vc.device)
+        self._convert_tensors([src], [g])
+
+    def _resolve_amp_dtype(self):
+        """Autocast dtype from FREEVC_DTYPE, or None to run in fp32."""
+        want = os.environ.get("FREEVC_DTYPE", "fp32").strip().lower()
+        if want in ("", "fp32", "float32") or self._vc.device.type != "cuda":
+            return None
+        import torch
+
+        if want in ("bf16", "bfloat16"):
+            if torch.cuda.is_bf16_supported():
+                return torch.bfloat16
+            _LOGGER.warning("FREEVC_DTYPE=bf16 not supported on this GPU; using fp16")
+            return torch.float16
+        if want in ("fp16", "float16", "half"):
+            return torch.float16
+        _LOGGER.warning("Unknown FREEVC_DTYPE=%r; using fp32", want)
+        return None
+
+    def _autocast(self):
+        if self._amp_dtype is None:
+            return nullcontext()
+        import torch
+
+        return torch.autocast(device_type="cuda", dtype=self._amp_dtype)
+
+    @property
+    def output_sample_rate(self) -> int:
+        return self.get_model().config.audio.output_sample_rate
+
+    def start_batching(self, max_batch: int = BATCH_MAX, max_wait_ms: float = BATCH_WAIT_MS) -> None:
+        """Route conversions through a coalescing batch worker."""
+        self.get_model()
+        if self._batcher is None:
+            self._batcher = _BatchRunner(self, max_batch, max_wait_ms, workers=self._scheduler.size)
+
+    # -- tensor API -------------------------------------------------------
+
+    def load_source(self, source_wav: str):
+        """Load a WAV as the 16 kHz float tensor FreeVC's content encoder expects."""
+        import soundfile as sf
+        import torch
+
+        data, sr = sf.read(source_wav, dtype="float32", always_2d=True)
+        x = data.mean(axis=1) if data.shape[1] > 1 else data[:, 0]
+        return self._to_input_rate(torch.from_numpy(x), sr)
+
+    def source_from_pcm16(self, pcm: bytes, sample_rate: int):
+        """In-memory counterpart of load_source() for raw s16le mono PCM."""
+        import torch
+
+        x = torch.frombuffer(bytearray(pcm), dtype=torch.int16).float() / 32768.0
+        return self._to_input_rate(x, sample_rate)
+
+    def _to_input_rate(self, x, sample_rate: int):
+        import torch
+
+        self.get_model()
+        h2d = self._h2d
+        if h2d is not None and x.device.type == "cpu":
+            x = h2d.upload(x.float())
+        else:
+            x = x.to(self._vc.device)
+        sr = self._vc.config.audio.input_sample_rate
+        if sample_rate != sr:
+            with torch.inference_mode():
+                x = self._resampler(int(sample_rate), sr)(x)
+        return x
+
+    def _resampler(self, src_sr: int, dst_sr: int):
+        """Resample transform per rate pair, built once on the model's device.
+
+        The sinc kernel is computed at construction, so reusing it turns
+        each resample into a single strided conv1d.
+        """
+        key = (src_sr, dst_sr)
+        r = self._resamplers.get(key)
+        if r is None:
+            import torchaudio
+
+            r = torchaudio.transforms.Resample(src_sr, dst_sr, resampling_method="sinc_interp_kaiser").to(self._vc.device)
+            self._resamplers[key] = r
+        return r
+
+    def target_embedding(self, target_wav: str):
+        """Speaker embedding of the target voice, shaped [1, D, 1].
+
+        Cached LRU on (path, mtime), so a server with a handful of fixed
+        target voices runs the speaker encoder once per voice.  With
+        FREEVC_SHM_CACHE the shared table is consulted before encoding.
+        """
+        try:
+            key = (target_wav, os.stat(target_wav).st_mtime_ns)
+        except OSError:
+            return self._compute_target_embedding(target_wav)
+        cache = self._emb_cache
+        with self._emb_lock:
+            g = cache.get(key)
+            if g is not None:
+                cache.move_to_end(key)
+                return g
+        shared = self._shared_emb
+        emb = shared.get(*key) if shared is not None else None
+        if emb is not None:
+            import torch
+
+            g = torch.from_numpy(emb)[None, :, None].to(self._vc.device)
+        else:
+            g = self._compute_target_embedding(target_wav)
+            if shared is not None:
+                shared.put(*key, g.detach().float().cpu().numpy())
+        with self._emb_lock:
+            cache[key] = g
+            while len(cache) > EMB_CACHE_MAX:
+                cache.popitem(last=False)
+        return g
+
+    def _compute_target_embedding(self, target_wav: str):
+        import librosa
+        import torch
+
+        self.get_model()
+        vc = self._vc
+        if not vc.config.model_args.use_spk:
+            raise RuntimeError("FreeVC model has no speaker encoder")
+        wav_tgt = self.load_source(target_wav).cpu().numpy()
+        wav_tgt, _ = librosa.effects.trim(wav_tgt, top_db=20)
+        with torch.inference_mode():
+            g = vc.enc_spk_ex.embed_utterance(wav_tgt)
+        return torch.from_numpy(g)[None, :, None].to(vc.device)
+
+    def convert_tensor(self, source_audio, target_embedding):
+        """Convert a 16 kHz source tensor to the target voice.
+
+        Returns a 1-D float tensor at output_sample_rate.
+        """
+        if self._batcher is not None:
+            return self._batcher.submit(source_audio, target_embedding)
+        return self._convert_tensors([source_audio], [target_embedding])[0]
+
+    def convert_pcm16(self, pcm: bytes, sample_rate: int, target_embedding) -> bytes:
+        """Convert s16le mono PCM; returns s16le at output_sample_rate.
+
+        The output is peak-normalized the same way Coqui's save_wav does,
+        so it matches what convert_to_file would have written.
+        """
+        import numpy as np
+
+        wav = self.convert_tensor(self.source_from_pcm16(pcm, sample_rate), target_embedding).cpu().float().numpy()
+        peak = float(np.max(np.abs(wav))) if wav.size else 0.0
+        wav = wav * (32767 / max(0.01, peak))
+        return wav.astype(np.int16).tobytes()
+
+    def _convert_tensors(self, sources: list, target_embeddings: list) -> list:
+        """Run one forward over a list of 1-D sources; returns 1-D outputs.
+
+        Callers hand in plain lists and the batch tensor is built exactly
+        once here (pad_sequence), never grown with repeated torch.cat.
+        """
+        import torch
+
+        self.get_model()
+        vc = self._vc
+        with self._scheduler.slot(), torch.inference_mode(), self._autocast():
+            g = torch.cat(target_embeddings)
+            if len(sources) == 1:
+                c = vc.extract_wavlm_features(sources[0][None, :])
+                return [vc.inference(c, g=g)[0, 0].float()]
+            from torch.nn.utils.rnn import pad_sequence
+
+            lens = torch.tensor([s.numel() for s in sources], device=vc.device)
+            y = pad_sequence(sources, batch_first=True)
+            padding_mask = torch.arange(y.size(1), device=vc.device)[None, :] >= lens[:, None]
+            # WavLM reduces the sample mask to its own frame mask; the
+            # per-item frame counts from it let enc_p/flow/dec mask padding.
+            c, frame_mask = vc.wavlm.extract_features(y, padding_mask=padding_mask)
+            c = c.transpose(1, 2)
+            c_lengths = (~frame_mask).sum(-1).clamp_(min=1)
+            audio = vc.inference(c, g=g, c_lengths=c_lengths)
+            hop = audio.size(-1) // c.size(-1)
+            ends = (c_lengths * hop).tolist()
+            return [audio[i, 0, :end].float() for i, end in enumerate(ends)]
+
+    # -- file API ---------------------------------------------------------
 
     def convert_to_file(self, source_wav: str, target_wav: str, file_path: str) -> None:
-        self.get_model().voice_conversion_to_file(source_wav=source_wav, target_wav=target_wav, file_path=file_path)  # type: ignore
+        vc = self._model
+        if vc is None:
+            vc = self.get_model()
+        from TTS.utils.audio.numpy_transforms import save_wav
 
+        config = vc.config
+        if not config.model_args.use_spk:
+            # The mel-spectrogram speaker path only exists inside Coqui.
+            with conversion_lock:
+                wav = vc.voice_conversion(source_wav, target_wav)
+        else:
+            wav = self.convert_tensor(self.load_source(source_wav), self.target_embedding(target_wav)).cpu().float().numpy()
+        save_wav(wav=wav, path=file_path, sample_rate=config.audio.output_sample_rate)
 
-def get_freevc_model() -> Optional[object]:
-    """Return a process-wide singleton FreeVC model, preferring CPU unless FREEVC_DEVICE=cuda.
-    Returns None if TTS is not installed or init fails.
+    def voice_conversion_to_file(self, source_wav: str, target_wav: str, file_path: str = "output.wav") -> str:
+        """Coqui ``TTS.voice_conversion_to_file`` signature over convert_to_file."""
+        self.convert_to_file(source_wav, target_wav, file_path)
+        return file_path
+
+    def convert_batch(self, items: Sequence[ConvertItem]) -> None:
+        """Convert several (source, target, output) WAV triples in one forward pass."""
+        self.get_model()
+        if len(items) == 1 or not self._vc.config.model_args.use_spk:
+            for item in items:
+                self.convert_to_file(*item)
+            return
+        from TTS.utils.audio.numpy_transforms import save_wav
+
+        sources = [self.load_source(source_wav) for source_wav, _, _ in items]
+        gs = [self.target_embedding(target_wav) for _, target_wav, _ in items]
+        sample_rate = self.output_sample_rate
+        for (_, _, file_path), wav in zip(items, self._convert_tensors(sources, gs)):
+            save_wav(wav=wav.cpu().float().numpy(), path=file_path, sample_rate=sample_rate)
+
+
+class _Job:
+    __slots__ = ("source", "target_embedding", "done", "result", "error")
+
+    def __init__(self, source, target_embedding) -> None:
+        self.source = source
+        self.target_embedding = target_embedding
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class _BatchRunner:
+    """Coalesces concurrent convert_tensor calls into one forward pass.
+
+    Each worker takes the first waiting job, then keeps collecting until
+    max_batch jobs are in hand or max_wait_ms have elapsed.  There is one
+    worker per scheduler slot, so while every slot is busy new requests
+    pile up here and leave as one larger batch.  If a batch fails, its
+    jobs are retried one by one so only the offending request sees the
+    error.
+    """
+
+    def __init__(self, service: FreeVCService, max_batch: int = BATCH_MAX, max_wait_ms: float = BATCH_WAIT_MS, workers: int = 1) -> None:
+        self._service = service
+        self._max_batch = max(1, int(max_batch))
+        self._max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._q: "queue.Queue[_Job]" = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"freevc-batch-{i}", daemon=True)
+            for i in range(max(1, int(workers)))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, source, target_embedding):
+        job = _Job(source, target_embedding)
+        self._q.put(job)
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _collect(self) -> List[_Job]:
+        get = self._q.get
+        batch = [get()]
+        deadline = time.monotonic() + self._max_wait
+        while len(batch) < self._max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        convert = self._service._convert_tensors
+        while True:
+            batch = self._collect()
+            try:
+                results = convert([job.source for job in batch], [job.target_embedding for job in batch])
+                for job, result in zip(batch, results):
+                    job.result = result
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0].error = e
+                else:
+                    _LOGGER.warning("FreeVC batch of %d failed (%s); retrying individually", len(batch), e)
+                    for job in batch:
+                        try:
+                            job.result = convert([job.source], [job.target_embedding])[0]
+                        except Exception as e1:
+                            job.error = e1
+            finally:
+                for job in batch:
+                    job.done.set()
+
+
+def _limit_torch_threads() -> None:
+    """Cap torch's intra-op pool unless the operator already sized it.
+
+    torch defaults to one thread per core; with Flask request threads,
+    Piper's ONNX sessions and Whisper sharing the box that oversubscribes
+    the CPU as soon as two conversions overlap.
     """
-    global _singleton_model
-    if _singleton_model is not None:
-        return _singleton_model
+    if os.environ.get("OMP_NUM_THREADS"):
+        return
+    try:
+        import torch
+
+        torch.set_num_threads(min(4, os.cpu_count() or 1))
+    except Exception:
+        pass
+
+
+def get_freevc_service() -> Optional[FreeVCService]:
+    """Return the process-wide FreeVCService with its model loaded.
+
+    Batching is enabled when FREEVC_BATCH=1.  Returns None if TTS is not
+    installed or init fails.
+    """
+    global _singleton_service
+    if _singleton_service is not None:
+        return _singleton_service
     with _singleton_init_lock:
-        if _singleton_model is not None:
-            return _singleton_model
+        if _singleton_service is not None:
+            return _singleton_service
         try:
+            _limit_torch_threads()
             svc = FreeVCService()
-            m = svc.get_model()
-            _singleton_model = m
-            return m
+            svc.get_model()
+            if _env_flag("FREEVC_BATCH"):
+                svc.start_batching()
+            _singleton_service = svc
+            return svc
         except Exception:
+            _LOGGER.exception("FreeVC init failed")
             return None
+
+
+def get_freevc_model() -> Optional[FreeVCService]:
+    """Return a process-wide singleton FreeVC model, preferring CPU unless FREEVC_DEVICE=cuda.
+    Returns None if TTS is not installed or init fails.
+
+    The result provides voice_conversion_to_file() like Coqui's TTS
+    object; use get_freevc_service().get_model() for the nn.Module.
+    """
+    return get_freevc_service()
+
+
+def _prewarm_worker() -> None:
+    svc = get_freevc_service()
+    if svc is None:
+        _LOGGER.warning("FreeVC prewarm: model unavailable")
+        return
+    try:
+        svc.warmup()
+        _LOGGER.info("FreeVC prewarm done")
+    except Exception as e:
+        _LOGGER.warning("FreeVC prewarm failed: %s", e)
+
+
+def prewarm() -> threading.Thread:
+    """Load and warm up the singleton model in a background thread.
+
+    Callers that need the model meanwhile just block on the singleton
+    init lock, so the first request waits only for what is left.
+    """
+    t = threading.Thread(target=_prewarm_worker, name="freevc-prewarm", daemon=True)
+    t.start()
+    return t
+
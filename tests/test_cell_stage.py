@@ -0,0 +1,95 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from speech_pipeline.AudioMixer import AudioMixer
+from speech_pipeline.base import AudioFormat, Stage
+from speech_pipeline.CellStage import CellStage
+from speech_pipeline.DelayLine import DelayLine
+from speech_pipeline.GainStage import GainStage
+from speech_pipeline.PipelineBuilder import PipelineBuilder
+
+
+def _builder():
+    return PipelineBuilder(ws=None, registry=None, args=SimpleNamespace())
+
+
+def test_dsl_buf_wraps_processor_in_cell():
+    run = _builder().build("mix:t:16000 | gain:2.0:buf=4 | delay:0")
+    mixer, cell, delay = run.stages
+    assert isinstance(mixer, AudioMixer)
+    assert isinstance(cell, CellStage) and isinstance(cell.stage, GainStage)
+    assert cell.stage.gain == 2.0
+    assert cell.cell.input_q.depth == cell.cell.output_q.depth == 4
+    assert cell.upstream is mixer and mixer.downstream is cell
+    assert isinstance(delay, DelayLine) and delay.upstream is cell
+    assert cell.stage.upstream is None
+
+
+def test_dsl_without_buf_builds_plain_stage():
+    run = _builder().build("mix:t:16000 | gain:2.0")
+    assert isinstance(run.stages[1], GainStage)
+
+
+@pytest.mark.parametrize("dsl", ["mix:t:16000 | tee:x:buf=4", "mix:t:16000 | gain:2.0:buf=0", "mix:t:16000 | gain:2.0:buf=x"])
+def test_dsl_rejects_bad_buf(dsl):
+    with pytest.raises(ValueError):
+        _builder().build(dsl)
+
+
+class _Source(Stage):
+    output_format = AudioFormat(16000, "s16le")
+
+    def __init__(self, chunks, pause_after=None, resume=None):
+        super().__init__()
+        self.chunks = chunks
+        self.pause_after = pause_after
+        self.resume = resume
+
+    def stream_pcm24k(self):
+        for i, chunk in enumerate(self.chunks):
+            if i == self.pause_after:
+                self.resume.wait(5)
+            yield chunk
+
+
+class _Sink(Stage):
+    def __init__(self):
+        super().__init__()
+        self.received = []
+
+    def run(self):
+        for chunk in self.upstream.stream_pcm24k():
+            self.received.append(chunk)
+
+
+def test_source_cell_sink_forwards_chunks_in_order_by_reference():
+    chunks = [bytes([i % 256, 0]) * 160 for i in range(500)]
+    cell = CellStage(GainStage(16000, 1.0), buffer=8)
+    sink = _Sink()
+    _Source(chunks).pipe(cell).pipe(sink)
+    sink.run()
+    assert len(sink.received) == len(chunks)
+    assert all(a is b for a, b in zip(sink.received, chunks))
+    assert not cell.cancelled
+
+
+def test_swap_keeps_the_stream_running():
+    resume = threading.Event()
+    chunks = [b"\x10\x00" * 160 for _ in range(20)]
+    cell = CellStage(GainStage(16000, 1.0), buffer=4)
+    sink = _Sink()
+    _Source(chunks, pause_after=10, resume=resume).pipe(cell).pipe(sink)
+    t = threading.Thread(target=sink.run)
+    t.start()
+    deadline = time.monotonic() + 5
+    while len(sink.received) < 10 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    cell.swap(GainStage(16000, 0.0))
+    resume.set()
+    t.join(5)
+    assert not t.is_alive()
+    assert sink.received[:10] == chunks[:10]
+    assert sink.received[10:] == [bytes(320)] * 10
@@ -0,0 +1,75 @@
+import queue
+import threading
+
+import pytest
+
+from speech_pipeline.live_pipeline import PingPong
+
+
+def test_single_thread_keeps_order():
+    pp = PingPong(depth=4)
+    for i in range(3):
+        pp.put(i)
+    assert [pp.get(timeout=0) for _ in range(3)] == [0, 1, 2]
+
+
+def test_idle_consumer_gets_each_chunk_at_once():
+    pp = PingPong(depth=100)
+    pp.put(b"a")
+    assert pp.get(timeout=0) == b"a"
+    pp.put(b"b")
+    assert pp.get(timeout=0) == b"b"
+
+
+def test_chunks_put_while_consumer_busy_are_not_stranded():
+    pp = PingPong(depth=100)
+    pp.put(1)           # handed over: consumer has a pending half
+    pp.put(2)           # collects in the fill half
+    pp.put(3)
+    assert pp.get(timeout=0) == 1
+    # producer goes idle; the rest must still reach the consumer
+    assert pp.get(timeout=0) == 2
+    assert pp.get(timeout=0) == 3
+    with pytest.raises(queue.Empty):
+        pp.get(timeout=0)
+
+
+def test_empty_raises_after_timeout():
+    pp = PingPong()
+    with pytest.raises(queue.Empty):
+        pp.get(timeout=0.01)
+
+
+def test_full_raises_without_buffering_the_chunk():
+    pp = PingPong(depth=2)
+    pp.put(0)           # pending half
+    pp.put(1)
+    pp.put(2)           # fill half now holds depth chunks
+    with pytest.raises(queue.Full):
+        pp.put(3, timeout=0.01)
+    assert [pp.get(timeout=0) for _ in range(3)] == [0, 1, 2]
+    with pytest.raises(queue.Empty):
+        pp.get(timeout=0)
+    pp.put(3, timeout=0)    # room again: the retried chunk goes through
+    assert pp.get(timeout=0) == 3
+
+
+def test_threads_preserve_order_with_back_pressure():
+    pp = PingPong(depth=3)
+    n = 2000
+
+    def produce():
+        for i in range(n):
+            pp.put(i, timeout=5)
+        pp.put(None, timeout=5)
+
+    t = threading.Thread(target=produce)
+    t.start()
+    out = []
+    while True:
+        chunk = pp.get(timeout=5)
+        if chunk is None:
+            break
+        out.append(chunk)
+    t.join()
+    assert out == list(range(n))
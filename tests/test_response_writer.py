@@ -0,0 +1,75 @@
+import struct
+
+from speech_pipeline.base import AudioFormat, Stage
+from speech_pipeline.ResponseWriter import ResponseWriter
+
+
+class _Chunks(Stage):
+    output_format = AudioFormat(24000, "s16le")
+
+    def __init__(self, sizes):
+        super().__init__()
+        self.sizes = sizes
+
+    def stream_pcm24k(self):
+        for n in self.sizes:
+            if self.cancelled:
+                return
+            yield b"\x01\x00" * (n // 2)
+
+
+class _Resp:
+    def __init__(self):
+        self.headers = {}
+
+
+def _run(writer):
+    body = b"".join(writer.stream())
+    riff, data = struct.unpack_from("<I", body, 4)[0], struct.unpack_from("<I", body, 40)[0]
+    resp = _Resp()
+    writer.apply_headers(resp)
+    return body, riff, data, resp.headers
+
+
+def test_estimate_declares_exact_size_and_pads_short_body():
+    writer = ResponseWriter(_Chunks([1000, 1000]), est_frames_24k=1500)
+    body, riff, data, headers = _run(writer)
+    assert data == 3000
+    assert riff == 36 + data
+    assert len(body) == 44 + data
+    assert headers["Content-Length"] == str(len(body))
+    assert body[44 + 2000:] == bytes(1000)
+
+
+def test_estimate_met_exactly_needs_no_padding():
+    writer = ResponseWriter(_Chunks([1000, 1000]), est_frames_24k=1000)
+    body, _riff, data, headers = _run(writer)
+    assert data == 2000
+    assert len(body) == 44 + 2000
+    assert headers["Content-Length"] == str(len(body))
+
+
+def test_overflow_is_clipped_to_declared_size():
+    source = _Chunks([1000, 1000, 1000])
+    writer = ResponseWriter(source, est_frames_24k=700)
+    body, _riff, data, headers = _run(writer)
+    assert data == 1400
+    assert len(body) == 44 + data
+    assert headers["Content-Length"] == str(len(body))
+    assert source.cancelled
+
+
+def test_streaming_is_open_ended():
+    writer = ResponseWriter(_Chunks([1000, 1000, 1000]), est_frames_24k=700, streaming=True)
+    body, riff, data, headers = _run(writer)
+    assert riff == data == 0xFFFFFFFF
+    assert len(body) == 44 + 3000
+    assert "Content-Length" not in headers
+
+
+def test_unknown_estimate_streams_open_ended():
+    writer = ResponseWriter(_Chunks([1000]), est_frames_24k=None)
+    body, riff, data, headers = _run(writer)
+    assert riff == data == 0xFFFFFFFF
+    assert len(body) == 44 + 1000
+    assert "Content-Length" not in headers
@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+from speech_pipeline.vc_service import SharedEmbCache
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs POSIX shared memory")
+
+
+def test_roundtrip_and_unlink():
+    name = f"freevc_emb_test_{os.getpid()}"
+    cache = SharedEmbCache(name=name, slots=4, dim=8)
+    try:
+        assert cache.get("a.wav", 1) is None
+        cache.put("a.wav", 1, range(8))
+        other = SharedEmbCache(name=name, slots=4, dim=8)
+        assert list(other.get("a.wav", 1)) == list(range(8))
+        assert other.get("a.wav", 2) is None
+        other.close()
+        assert os.path.exists(f"/dev/shm/{name}")
+    finally:
+        cache.unlink()
+    assert not os.path.exists(f"/dev/shm/{name}")